@@ -5,15 +5,17 @@ from email_validator import validate_email, EmailNotValidError
 
 from fastapi import HTTPException, status, Depends
 
-from sqlmodel import select, or_
+from sqlmodel import select, or_, delete
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.core.utils.deps import SessionDep
-from app.core.security import get_password_hash, verify_password
+from app.core.utils.deps import SessionDep, user_cache
+from app.core.security import get_password_hash_async, verify_password_async
 from app.core.utils.logger import logger
 from app.core.utils.generic_models import RoleEnum
 
+from app.todo.models import TodoTombstone
+
 from .schemas import UserCreate, UserUpdate
 from .models import User
 from datetime import datetime, timezone
@@ -78,15 +80,20 @@ class AuthCrud:
             User
         """
         try:
+            hashed_password = await get_password_hash_async(user_create.password)
             db_obj = User.model_validate(
                 user_create,
-                update={"hashed_password": get_password_hash(user_create.password)},
+                update={"hashed_password": hashed_password, "role": role},
             )
             self.session.add(db_obj)
             await self.session.commit()
             await self.session.refresh(db_obj)
             return db_obj
 
+        except HTTPException as e:
+            logger.info(str(e))
+            raise e
+
         except Exception as e:
             await self.session.rollback()
             logger.info(str(e))
@@ -117,14 +124,20 @@ class AuthCrud:
             extra_data = {}
             if "password" in user_data:
                 password = user_data["password"]
-                hashed_password = get_password_hash(password)
+                hashed_password = await get_password_hash_async(password)
                 extra_data["hashed_password"] = hashed_password
             db_user.sqlmodel_update(user_data, update=extra_data)
             self.session.add(db_user)
             await self.session.commit()
+            user_cache.delete(user_id)
             await self.session.refresh(db_user)
             return db_user
 
+        except HTTPException as e:
+            await self.session.rollback()
+            logger.info(str(e))
+            raise e
+
         except Exception as e:
             await self.session.rollback()
             logger.info(str(e))
@@ -153,7 +166,11 @@ class AuthCrud:
                 )
 
             await self.session.delete(user_to_delete)
+            await self.session.exec(
+                delete(TodoTombstone).where(TodoTombstone.user_id == user_id)  # type: ignore
+            )
             await self.session.commit()
+            user_cache.delete(user_id)
 
             return user_to_delete
 
@@ -187,7 +204,7 @@ class AuthCrud:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="User Does Not Exist",
                 )
-            if not verify_password(password, db_user.hashed_password):
+            if not await verify_password_async(password, db_user.hashed_password):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Incorrect email or password",
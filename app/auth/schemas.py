@@ -57,3 +57,7 @@ class Token(SQLModel):
 class TokenPayload(SQLModel):
     sub: Optional[UUID] = None
     username: Optional[str] = None
+    # Only present on tokens issued with AUTH_STATELESS_TOKENS enabled
+    email: Optional[str] = None
+    role: Optional[RoleEnum] = None
+    is_active: Optional[bool] = None
@@ -10,7 +10,7 @@ from datetime import datetime, timedelta, timezone
 
 from app.core.utils.deps import CurrentUserDep
 from app.core.config import settings
-from app.core.utils.generic_models import Message
+from app.core.utils.generic_models import Message, RoleEnum
 from app.core.security import get_password_hash, verify_password, create_access_token
 
 from .models import User
@@ -20,6 +20,17 @@ from .crud import AuthCrudDep
 AuthRouter = APIRouter()
 
 
+def _access_token_data(user: User) -> dict[str, Any]:
+    data: dict[str, Any] = {"sub": user.id, "username": user.username}
+    if settings.AUTH_STATELESS_TOKENS:
+        data.update(
+            email=user.email,
+            role=RoleEnum(user.role or RoleEnum.USER).value,
+            is_active=user.is_active,
+        )
+    return data
+
+
 @AuthRouter.post("/sign-up", response_model=Token)
 async def signUp_route(AuthCrud: AuthCrudDep, user_create: UserCreate):
     """
@@ -45,7 +56,7 @@ async def signUp_route(AuthCrud: AuthCrudDep, user_create: UserCreate):
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
         access_token = create_access_token(
-            data={"sub": created_user.id, "username": created_user.username},
+            data=_access_token_data(created_user),
             expires_delta=access_token_expires,
         )
         if not access_token:
@@ -94,7 +105,7 @@ async def login_route(
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
         access_token = create_access_token(
-            data={"sub": user.id, "username": user.username},
+            data=_access_token_data(user),
             expires_delta=access_token_expires,
         )
         if not access_token:
@@ -140,13 +151,21 @@ async def delete_account_route(AuthCrud: AuthCrudDep, current_user: CurrentUserD
 
 
 @AuthRouter.get("/profile", response_model=UserOut)
-async def get_profile_route(current_user: CurrentUserDep):
+async def get_profile_route(AuthCrud: AuthCrudDep, current_user: CurrentUserDep):
     try:
         if not isinstance(current_user.id, UUID):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
             )
+        if settings.AUTH_STATELESS_TOKENS:
+            # Token claims only carry identity, the profile itself is read fresh
+            db_user = await AuthCrud.get_user(user_id=current_user.id)
+            if db_user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                )
+            current_user = db_user
         return UserOut(**current_user.model_dump())
 
     except HTTPException as e:
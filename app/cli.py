@@ -0,0 +1,93 @@
+"""
+One-shot management commands, for deployments that skip the schema work at boot
+(DB_INIT_ON_STARTUP=false), such as serverless ones.
+
+    poetry run python -m app.cli init-db
+    poetry run python -m app.cli migrate status
+    poetry run python -m app.cli migrate upgrade [--to VERSION]
+    poetry run python -m app.cli migrate downgrade [--to VERSION]
+    poetry run python -m app.cli prune-tombstones
+"""
+
+import argparse
+import asyncio
+from typing import Optional
+
+from app.core import migrations
+from app.core.db import async_engine, init_db
+from app.core.utils.logger import logger_config
+
+logger = logger_config(__name__)
+
+
+def run_init_db() -> None:
+    """
+    Migrates the schema and seeds the first superuser, on a loop of its own.
+    """
+    # Registers every model, which seeding the superuser relies on
+    import app.main  # noqa: F401
+
+    async def run() -> None:
+        try:
+            await init_db()
+        finally:
+            await async_engine.dispose()
+
+    logger.info("Migrating DB schema")
+    asyncio.run(run())
+    logger.info("DB schema Migration Successfull")
+
+
+async def _migrate(action: str, target: Optional[int]) -> None:
+    try:
+        if action == "upgrade":
+            versions = await migrations.upgrade(async_engine, target)
+            print(f"Applied: {versions or 'nothing to apply'}")
+        elif action == "downgrade":
+            versions = await migrations.downgrade(async_engine, target)
+            print(f"Reverted: {versions or 'nothing to revert'}")
+        async with async_engine.connect() as conn:
+            current = await migrations.current_version(conn)
+        print(f"Schema version: {current} (latest: {migrations.head_version()})")
+    finally:
+        await async_engine.dispose()
+
+
+async def _prune_tombstones() -> None:
+    from app.todo.tombstones import prune_tombstones
+
+    try:
+        print(f"Pruned {await prune_tombstones(async_engine)} todo tombstones")
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "init-db", help="Migrate the schema and seed the first superuser"
+    )
+    migrate = commands.add_parser("migrate", help="Manage the schema version")
+    migrate.add_argument("action", choices=["status", "upgrade", "downgrade"])
+    migrate.add_argument(
+        "--to",
+        type=int,
+        help="Target version (default: the latest on upgrade, one down on downgrade)",
+    )
+    commands.add_parser(
+        "prune-tombstones",
+        help="Delete the todo tombstones past TODO_TOMBSTONE_RETENTION_DAYS",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "init-db":
+        run_init_db()
+    elif args.command == "migrate":
+        asyncio.run(_migrate(args.action, args.to))
+    elif args.command == "prune-tombstones":
+        asyncio.run(_prune_tombstones())
+
+
+if __name__ == "__main__":
+    main()
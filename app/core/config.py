@@ -1,6 +1,7 @@
+import json
 import secrets
 import warnings
-from typing import Annotated, Any, Literal, Union
+from typing import Annotated, Any, Literal, Optional, Union
 from enum import Enum
 
 from pydantic import (
@@ -24,6 +25,18 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+def parse_url_list(v: Any) -> list[str]:
+    """
+    Parses a list of database URLs given as a JSON array or separated by
+    whitespace; not by commas, which separate the hosts of a multi-host URL.
+    """
+    if isinstance(v, str):
+        v = json.loads(v) if v.lstrip().startswith("[") else v.split()
+    if isinstance(v, list) and all(isinstance(url, str) for url in v):
+        return [url.strip() for url in v if url.strip()]
+    raise ValueError(v)
+
+
 class EnvironmentEnum(str, Enum):
     development = "development"
     production = "production"
@@ -42,6 +55,65 @@ class Settings(BaseSettings):
     VERSION: str = "1.0"
     API_STR: str = "/api/v1"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 2  # 2 hours
+    # Carry role / is_active / email as signed claims and trust them until the
+    # token expires, skipping the user lookup on authenticated requests
+    AUTH_STATELESS_TOKENS: bool = False
+    USER_CACHE_MAXSIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    # bcrypt runs on a dedicated thread pool; 0 workers means min(4, cpu count).
+    # Requests beyond workers + queue are rejected with 429.
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # JSON encoder of responses and decoder of large request bodies; "orjson"
+    # falls back to "json" (stdlib) when orjson is not installed
+    JSON_BACKEND: Literal["orjson", "json"] = "orjson"
+    # Response compression. Encodings are in order of preference; "br" and "zstd"
+    # are skipped unless the brotli / zstandard packages are installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_ENCODINGS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = [
+        "zstd",
+        "br",
+        "gzip",
+    ]
+    COMPRESSION_CONTENT_TYPES: Annotated[
+        list[str] | str, BeforeValidator(parse_cors)
+    ] = ["application/json", "application/x-ndjson", "text/html", "text/plain"]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # Per-route latency and SQL statement metrics, and opt-in, a Server-Timing
+    # header (db, pool, auth, serialise, app) on every response. The header tells
+    # any client about the backend's query counts and timings, so it is meant for
+    # development and internal deployments.
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = False
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    # /metrics output is reused for this long, however often it is scraped
+    METRICS_RENDER_MAX_AGE_SECONDS: float = 1.0
+    # /metrics is served to clients whose address is in METRICS_ALLOWED_IPS
+    # (addresses or networks, loopback only by default) and to requests bearing
+    # METRICS_TOKEN, from anywhere
+    METRICS_ALLOWED_IPS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = [
+        "127.0.0.1",
+        "::1",
+    ]
+    METRICS_TOKEN: Optional[str] = None
+    # Opt-in diagnostics: a watchdog logging the stack of any callback blocking
+    # the event loop for longer than the threshold, and an admin-only sampling
+    # profiler at /debug/profile
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_THRESHOLD_SECONDS: float = 0.1
+    PROFILER_ENABLED: bool = False
+    PROFILER_MAX_SECONDS: float = 30.0
+    # Server of `python -m app.serve`; 0 workers means one per CPU. Requests
+    # beyond SERVER_LIMIT_CONCURRENCY per worker are answered with 503.
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
     DOMAIN: str = "localhost"
     ENVIRONMENT: Union[EnvironmentEnum, str] = EnvironmentEnum.development
 
@@ -63,6 +135,63 @@ class Settings(BaseSettings):
 
     POSTGRES_DATABASE_URL: str
 
+    # Connection pool profile: "queue" keeps a local pool of connections, "null"
+    # opens one per session (serverless / Vercel), "pgbouncer" keeps a local pool
+    # but disables prepared statement caching for transaction-mode poolers
+    DB_POOL_PROFILE: Literal["queue", "null", "pgbouncer"] = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 600
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_ECHO: bool = False
+    # Apply pending migrations and seed the first superuser in the app lifespan;
+    # when off, startup only checks that the schema is up to date. The app.serve
+    # launcher migrates once before starting its workers instead.
+    DB_INIT_ON_STARTUP: bool = True
+
+    # Optional read replicas serving the GET endpoints, separated by whitespace.
+    # A user is pinned to the primary for DB_READ_YOUR_WRITES_SECONDS after each
+    # of their writes; at most DB_READ_YOUR_WRITES_MAXSIZE recent writers are
+    # tracked per process, the oldest being dropped first.
+    POSTGRES_REPLICA_URLS: Annotated[
+        list[str] | str, BeforeValidator(parse_url_list)
+    ] = []
+    DB_REPLICA_SELECTION: Literal["round_robin", "least_connections"] = "round_robin"
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_READ_YOUR_WRITES_MAXSIZE: int = 100_000
+
+    TODO_PAGE_DEFAULT_LIMIT: int = 100
+    TODO_PAGE_MAX_LIMIT: int = 500
+    TODO_EXPORT_CHUNK_SIZE: int = 500
+    TODO_BATCH_MAX_SIZE: int = 500
+    TODO_SYNC_MAX_CHANGES: int = 500
+    # Changes younger than this are held back from /todo/changes. Rows are stamped
+    # before their transaction commits, so without it a write committed after a
+    # poll could carry a timestamp behind the token that poll returned and be
+    # skipped; it must exceed the longest write transaction plus any clock skew.
+    TODO_SYNC_SETTLE_SECONDS: float = 5.0
+    # Tombstones of deleted todos are kept this long, and sync tokens older than
+    # this are refused with 410 Gone, as the deletions since may have been pruned.
+    # Every worker prunes them every TODO_TOMBSTONE_PRUNE_INTERVAL_SECONDS
+    # (0 leaves it to `python -m app.cli prune-tombstones`).
+    TODO_TOMBSTONE_RETENTION_DAYS: int = 30
+    TODO_TOMBSTONE_PRUNE_INTERVAL_SECONDS: float = 3600.0
+    # "local" delivers todo change events within one worker, "postgres" fans
+    # them out across workers with LISTEN / NOTIFY
+    TODO_EVENTS_BROKER: Literal["local", "postgres"] = "local"
+    TODO_EVENTS_QUEUE_SIZE: int = 100
+    TODO_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    # "memory" caches todo reads per process, "none" disables the cache. A write
+    # only invalidates the cache of the worker that handled it, so with several
+    # workers the others may serve todo items and stats up to
+    # TODO_CACHE_TTL_SECONDS old. Unset, it is "memory" except under app.serve
+    # with more than one worker, where it is "none".
+    TODO_CACHE_BACKEND: Optional[Literal["memory", "none"]] = None
+    TODO_CACHE_MAXSIZE: int = 10_000
+    TODO_CACHE_TTL_SECONDS: float = 30.0
+
     # def _check_default_secret(self, var_name: str, value: str | None) -> None:
     #     if value == "changethis":
     #         message = (
@@ -97,4 +226,12 @@ class TestSettings(Settings):
     TEST_USER_PASSWORD : str
 
 
-test_settings = TestSettings()  # type: ignore
+
+def __getattr__(name: str) -> Any:
+    # TestSettings needs the TEST_* variables, so it is only built when the
+    # tests ask for it, not on every production start
+    if name == "test_settings":
+        global test_settings
+        test_settings = TestSettings()  # type: ignore
+        return test_settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
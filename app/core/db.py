@@ -1,39 +1,140 @@
+import itertools
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
 from sqlmodel import SQLModel, Session, select, create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core import migrations
 from app.core.config import settings
+from app.core.utils.cache import TTLCache
 from app.core.utils.generic_models import RoleEnum
+from app.core.utils.instrumentation import instrument_engine
 
 from app.auth.models import User
 from app.auth.schemas import UserCreate
 from app.todo.models import Todo
 
-async_connection_string = (
-    str(settings.POSTGRES_DATABASE_URL)
-    .replace("postgresql", "postgresql+asyncpg")
-    .replace("sslmode=require", "")
+def to_async_url(url: str) -> str:
+    return str(url).replace("postgresql", "postgresql+asyncpg").replace(
+        "sslmode=require", ""
+    )
+
+
+def engine_options() -> dict[str, Any]:
+    """
+    Builds the `create_async_engine` keyword arguments for the configured `DB_POOL_PROFILE`.
+    """
+    options: dict[str, Any] = {"echo": settings.DB_ECHO}
+
+    if settings.DB_POOL_PROFILE == "null":
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    if settings.DB_POOL_PROFILE == "pgbouncer":
+        # Server connections are shared between clients in transaction mode, so
+        # prepared statements must be neither cached nor reused by name
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def create_db_engine(url: str, name: str = "primary") -> AsyncEngine:
+    engine = create_async_engine(url=to_async_url(url), **engine_options())
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine, name=name)
+    return engine
+
+
+async_connection_string = to_async_url(settings.POSTGRES_DATABASE_URL)
+
+async_engine = create_db_engine(settings.POSTGRES_DATABASE_URL)
+
+# Built once and shared by every request
+async_session_maker = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
-async_engine = create_async_engine(
-    url=async_connection_string,
-    # echo=True,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30.0,
-    pool_recycle=600,
+
+class ReplicaRouter:
+    """
+    Picks the read replica that serves a read-only session.
+
+    Users who wrote within the last `sticky_seconds` are kept on the primary so
+    that they read their own writes. Write times are tracked per process only.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        selection: str,
+        sticky_seconds: float,
+        sticky_maxsize: int = 100_000,
+    ) -> None:
+        self.engines = engines
+        self.selection = selection
+        self.session_makers = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            for engine in engines
+        ]
+        self._counter = itertools.count()
+        self._recent_writers: TTLCache[UUID, bool] = TTLCache(
+            maxsize=sticky_maxsize, ttl=sticky_seconds
+        )
+
+    def mark_write(self, user_id: UUID) -> None:
+        if self.engines:
+            self._recent_writers.set(user_id, True)
+
+    def session_maker_for(self, user_id: UUID) -> Optional[async_sessionmaker]:
+        """
+        Returns the session factory of the chosen replica, or None when the
+        read should go to the primary.
+        """
+        if not self.engines or self._recent_writers.get(user_id) is not None:
+            return None
+
+        if self.selection == "least_connections":
+            index = min(
+                range(len(self.engines)),
+                key=lambda i: getattr(self.engines[i].pool, "checkedout", lambda: 0)(),
+            )
+        else:
+            index = next(self._counter) % len(self.engines)
+        return self.session_makers[index]
+
+
+replica_router = ReplicaRouter(
+    engines=[
+        create_db_engine(url, name=f"replica{index}")
+        for index, url in enumerate(settings.POSTGRES_REPLICA_URLS)
+    ],
+    selection=settings.DB_REPLICA_SELECTION,
+    sticky_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+    sticky_maxsize=settings.DB_READ_YOUR_WRITES_MAXSIZE,
 )
 
 
 async def init_db(Engine=async_engine) -> None:
-    # Tables should be created with Alembic migrations
-    # But if you don't want to use migrations, create
-    # the tables un-commenting the next lines
-
-    # This works because the models are already imported and registered from app
-    async with Engine.begin() as async_conn:
-        await async_conn.run_sync(SQLModel.metadata.create_all)
+    # Brings the schema to the latest version, then seeds the first superuser
+    await migrations.upgrade(Engine)
 
     async_session = async_sessionmaker(
         bind=Engine, class_=AsyncSession, expire_on_commit=False
@@ -56,3 +157,8 @@ async def init_db(Engine=async_engine) -> None:
                 password=settings.FIRST_SUPERUSER_PASSWORD,
             )
             user = await authCrud.create_user(user_create=user_in, role=RoleEnum.ADMIN)
+        elif user.role != RoleEnum.ADMIN:
+            # Superusers seeded before roles were stored were created as users
+            user.role = RoleEnum.ADMIN
+            session.add(user)
+            await session.commit()
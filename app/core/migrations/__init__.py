@@ -0,0 +1,188 @@
+"""
+Versioned schema migrations.
+
+Every module of `versions` named v<version>_<name> is a migration defining
+`upgrade(conn)` and `downgrade(conn)` coroutines. A migration runs in a
+transaction together with its schema_version record, unless it sets
+TRANSACTIONAL = False, which CREATE INDEX CONCURRENTLY requires; such migrations
+must be safe to run again after an interruption.
+"""
+
+import importlib
+import pkgutil
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import cache
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.utils.logger import logger_config
+
+from . import versions
+
+logger = logger_config(__name__)
+
+# Key of the advisory lock taken while migrating, so that processes starting
+# at the same time migrate one after the other
+MIGRATION_LOCK_KEY = 0x746F646F
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+    downgrade: Callable[[AsyncConnection], Awaitable[None]]
+    transactional: bool = True
+
+
+@cache
+def load_migrations() -> tuple[Migration, ...]:
+    migrations: dict[int, Migration] = {}
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        prefix, _, name = module_info.name.partition("_")
+        if not (prefix.startswith("v") and prefix[1:].isdigit()):
+            continue
+        version = int(prefix[1:])
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}")
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations[version] = Migration(
+            version=version,
+            name=name,
+            upgrade=module.upgrade,
+            downgrade=module.downgrade,
+            transactional=getattr(module, "TRANSACTIONAL", True),
+        )
+    return tuple(migrations[version] for version in sorted(migrations))
+
+
+def head_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """
+    Returns the version of the database schema, 0 when it was never migrated.
+    """
+    if await conn.scalar(text("SELECT to_regclass('schema_version')")) is None:
+        return 0
+    return await conn.scalar(text("SELECT coalesce(max(version), 0) FROM schema_version"))
+
+
+@asynccontextmanager
+async def _migration_connection(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        )
+        try:
+            await conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_version ("
+                    "version INTEGER PRIMARY KEY, "
+                    "name VARCHAR NOT NULL, "
+                    "applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL "
+                    "DEFAULT (now() AT TIME ZONE 'utc'))"
+                )
+            )
+            yield conn
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+
+
+async def _run(
+    engine: AsyncEngine,
+    conn: AsyncConnection,
+    migration: Migration,
+    step: Callable[[AsyncConnection], Awaitable[None]],
+    record: str,
+) -> None:
+    params = {"version": migration.version, "name": migration.name}
+    if not migration.transactional:
+        await step(conn)
+        await conn.execute(text(record), params)
+        return
+    async with engine.begin() as transaction:
+        await step(transaction)
+        await transaction.execute(text(record), params)
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[int] = None) -> list[int]:
+    """
+    Applies the migrations above the current version up to `target`, the latest
+    by default, and returns the versions applied.
+    """
+    target = head_version() if target is None else target
+    applied = []
+    async with _migration_connection(engine) as conn:
+        current = await current_version(conn)
+        for migration in load_migrations():
+            if not current < migration.version <= target:
+                continue
+            logger.info("Applying migration %s %s", migration.version, migration.name)
+            await _run(
+                engine,
+                conn,
+                migration,
+                migration.upgrade,
+                "INSERT INTO schema_version (version, name) VALUES (:version, :name)",
+            )
+            applied.append(migration.version)
+    return applied
+
+
+async def downgrade(engine: AsyncEngine, target: Optional[int] = None) -> list[int]:
+    """
+    Reverts the migrations above `target`, one version down by default, and
+    returns the versions reverted.
+    """
+    reverted = []
+    async with _migration_connection(engine) as conn:
+        current = await current_version(conn)
+        target = current - 1 if target is None else target
+        for migration in reversed(load_migrations()):
+            if not target < migration.version <= current:
+                continue
+            logger.info("Reverting migration %s %s", migration.version, migration.name)
+            await _run(
+                engine,
+                conn,
+                migration,
+                migration.downgrade,
+                "DELETE FROM schema_version WHERE version = :version "
+                "AND name = :name",
+            )
+            reverted.append(migration.version)
+    return reverted
+
+
+async def check_schema(engine: AsyncEngine) -> int:
+    """
+    Verifies that the database schema is migrated to the version this code
+    expects, with a single query, and returns its version.
+
+    Raises:
+        RuntimeError: If migrations are pending.
+    """
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+    head = head_version()
+    if version < head:
+        raise RuntimeError(
+            f"The database schema is at version {version} but {head} is required; "
+            "run `python -m app.cli migrate upgrade`"
+        )
+    if version > head:
+        # Expected while a newer release is rolled out
+        logger.warning(
+            "The database schema is at version %s, newer than %s", version, head
+        )
+    return version
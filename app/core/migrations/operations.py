@@ -0,0 +1,33 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def execute(conn: AsyncConnection, *statements: str) -> None:
+    for statement in statements:
+        await conn.execute(text(statement))
+
+
+async def create_index_concurrently(
+    conn: AsyncConnection, name: str, definition: str
+) -> None:
+    """
+    Builds the index `name` on `definition` ("table USING method (columns)")
+    without blocking writes to the table. Only allowed in migrations with
+    TRANSACTIONAL = False.
+
+    An interrupted concurrent build leaves an invalid index behind, which IF NOT
+    EXISTS would keep; it is dropped and built again.
+    """
+    valid = await conn.scalar(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    )
+    if valid is False:
+        await drop_index_concurrently(conn, name)
+    await execute(
+        conn, f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"
+    )
+
+
+async def drop_index_concurrently(conn: AsyncConnection, name: str) -> None:
+    await execute(conn, f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
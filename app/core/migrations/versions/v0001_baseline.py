@@ -0,0 +1,77 @@
+"""
+Users, todos and todo tombstones.
+
+Every statement is IF NOT EXISTS, so that databases created by the former
+create_all at startup are adopted as they are.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..operations import execute
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await execute(
+        conn,
+        """
+        DO $$ BEGIN
+            CREATE TYPE roleenum AS ENUM ('USER', 'ADMIN');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id UUID NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            email VARCHAR,
+            username VARCHAR NOT NULL,
+            full_name VARCHAR,
+            email_verified BOOLEAN,
+            is_active BOOLEAN,
+            hashed_password VARCHAR NOT NULL,
+            role roleenum,
+            PRIMARY KEY (id),
+            UNIQUE (email)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)",
+        """
+        CREATE TABLE IF NOT EXISTS todo (
+            id UUID NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            title VARCHAR NOT NULL,
+            description VARCHAR,
+            iscompleted BOOLEAN,
+            user_id UUID NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_todo_id ON todo (id)",
+        "CREATE INDEX IF NOT EXISTS ix_todo_user_id ON todo (user_id)",
+        """
+        CREATE TABLE IF NOT EXISTS todo_tombstone (
+            id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            deleted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_todo_tombstone_user_id_deleted_at
+        ON todo_tombstone (user_id, deleted_at)
+        """,
+    )
+
+
+async def downgrade(conn: AsyncConnection) -> None:
+    await execute(
+        conn,
+        "DROP TABLE IF EXISTS todo_tombstone",
+        "DROP TABLE IF EXISTS todo",
+        "DROP TABLE IF EXISTS users",
+        "DROP TYPE IF EXISTS roleenum",
+    )
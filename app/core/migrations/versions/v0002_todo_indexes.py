@@ -0,0 +1,35 @@
+"""
+Indexes of the todo list: keyset pages, updated sorts, completion filter and
+full-text search.
+
+create_all never added indexes to existing tables, so databases created before
+these were declared on the model lack them. They are built concurrently, without
+blocking writes to a large todo table.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..operations import create_index_concurrently, drop_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    "ix_todo_user_id_id": "todo (user_id, id)",
+    "ix_todo_user_id_updated_at": "todo (user_id, updated_at)",
+    "ix_todo_user_id_iscompleted_id": "todo (user_id, iscompleted, id)",
+    # Must match app.todo.models.todo_search_vector exactly
+    "ix_todo_search": (
+        "todo USING gin (to_tsvector('simple'::regconfig, "
+        "coalesce(title, '') || ' ' || coalesce(description, '')))"
+    ),
+}
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for name, definition in INDEXES.items():
+        await create_index_concurrently(conn, name, definition)
+
+
+async def downgrade(conn: AsyncConnection) -> None:
+    for name in INDEXES:
+        await drop_index_concurrently(conn, name)
@@ -1,13 +1,122 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
 from uuid import UUID
 
-from jose import jwt
-from passlib.context import CryptContext
+from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.utils.metrics import metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+# passlib and jose are imported on first use rather than at startup, which
+# keeps them off the cold start of requests that neither hash nor sign tokens
+@cache
+def pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+T = TypeVar("T")
+
+
+class PasswordHasherPool:
+    """
+    Runs bcrypt hashing and verification on a dedicated, size-limited thread pool
+    so that it never blocks the event loop.
+
+    At most `max_workers` calls run at once and `max_queue` more may wait; any
+    call beyond that is rejected with 429 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers or max(1, min(4, os.cpu_count() or 1))
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="bcrypt"
+        )
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        # Counters are only touched from the event loop thread
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, func, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hasher_pool = PasswordHasherPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+metrics.gauge(
+    "password_hash_in_flight",
+    "bcrypt calls running or queued",
+    callback=lambda: {(): hasher_pool.in_flight},
+)
+metrics.gauge(
+    "password_hash_queued",
+    "bcrypt calls waiting for a worker",
+    callback=lambda: {(): hasher_pool.stats()["queued"]},
+)
+metrics.gauge(
+    "password_hash_completed_total",
+    "bcrypt calls completed successfully",
+    callback=lambda: {(): hasher_pool.completed},
+    kind="counter",
+)
+metrics.gauge(
+    "password_hash_failed_total",
+    "bcrypt calls that raised or were cancelled",
+    callback=lambda: {(): hasher_pool.failed},
+    kind="counter",
+)
+metrics.gauge(
+    "password_hash_rejected_total",
+    "bcrypt calls rejected with 429",
+    callback=lambda: {(): hasher_pool.rejected},
+    kind="counter",
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -32,6 +141,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if "sub" in to_encode and isinstance(to_encode["sub"], UUID):
         to_encode["sub"] = str(to_encode["sub"])
 
+    from jose import jwt
+
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
@@ -39,9 +150,32 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict[str, Any]:
+    """
+    Returns the claims of a token signed with SECRET_KEY.
+
+    Raises:
+        ValueError: If the token is malformed, wrongly signed or expired.
+    """
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise ValueError(str(e)) from e
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hasher_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hasher_pool.run(get_password_hash, password)
@@ -0,0 +1,226 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar, Union
+
+from .metrics import Labels, metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded in-process LRU cache whose entries expire `ttl` seconds after being set.
+
+    It is meant to be used from the event loop only and is not thread-safe.
+    A `maxsize` or `ttl` of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(ABC):
+    """
+    Key/value store behind `ResponseCache`.
+
+    The interface maps onto a Redis-compatible store (GET, SET with EX, INCR)
+    so that a networked backend can be shared by every worker.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Per-process `CacheBackend` built on `TTLCache`.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._entries: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Counters outlive entries so that a bumped version is not forgotten
+        # while entries cached under an older one may still be alive
+        self._counters: TTLCache[str, int] = TTLCache(
+            maxsize=maxsize, ttl=max(ttl * 10, 3600)
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        counter = self._counters.get(key)
+        if counter is not None:
+            return str(counter).encode()
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value)
+
+    async def incr(self, key: str) -> int:
+        # A counter that was evicted restarts from the clock rather than 0, so it
+        # can never collide with a version handed out before the eviction
+        value = max((self._counters.get(key) or 0) + 1, time.monotonic_ns())
+        self._counters.set(key, value)
+        return value
+
+
+class NullCacheBackend(CacheBackend):
+    """
+    `CacheBackend` that stores nothing, used when caching is disabled.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        return None
+
+    async def incr(self, key: str) -> int:
+        return 0
+
+
+class ResponseCache:
+    """
+    Versioned read-through cache of serialised responses.
+
+    Entries are grouped by scope (e.g. one user's todos) and stored under the
+    scope's current version, so `invalidate` is a single counter bump that
+    orphans every entry of the scope without scanning keys.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: float) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def _version(self, scope: str) -> int:
+        version_key = f"{self.namespace}:{scope}:version"
+        version = await self.backend.get(version_key)
+        if version is None:
+            return await self.backend.incr(version_key)
+        return int(version)
+
+    async def get(self, scope: str, key: str) -> tuple[Optional[bytes], int]:
+        """
+        Returns the entry, if any, and the scope version it was looked up under,
+        which must be passed to `set` when the value is computed on a miss.
+        """
+        version = await self._version(scope)
+        value = await self.backend.get(f"{self.namespace}:{scope}:{version}:{key}")
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value, version
+
+    async def set(self, scope: str, key: str, value: bytes, version: int) -> None:
+        # Stored under the version seen before reading the data: had a write
+        # invalidated the scope since, the entry is orphaned instead of served
+        await self.backend.set(
+            f"{self.namespace}:{scope}:{version}:{key}", value, self.ttl
+        )
+
+    async def invalidate(self, scope: str) -> None:
+        await self.backend.incr(f"{self.namespace}:{scope}:version")
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_cache_backend(name: str, maxsize: int, ttl: float) -> CacheBackend:
+    if name == "memory":
+        return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+    return NullCacheBackend()
+
+
+# Caches reported in the cache metrics, by name
+_observed_caches: dict[str, Union[TTLCache, ResponseCache]] = {}
+
+
+def observe_cache(name: str, cache: Union[TTLCache, ResponseCache]) -> None:
+    _observed_caches[name] = cache
+
+
+def _cache_counts(attribute: str) -> dict[Labels, float]:
+    return {
+        (name,): getattr(cache, attribute)
+        for name, cache in list(_observed_caches.items())
+    }
+
+
+def _cache_hit_ratios() -> dict[Labels, float]:
+    return {
+        (name,): cache.hits / (cache.hits + cache.misses)
+        for name, cache in list(_observed_caches.items())
+        if cache.hits + cache.misses
+    }
+
+
+metrics.gauge(
+    "cache_hits_total",
+    "Cache lookups that found an entry",
+    ("cache",),
+    callback=lambda: _cache_counts("hits"),
+    kind="counter",
+)
+metrics.gauge(
+    "cache_misses_total",
+    "Cache lookups that found no entry",
+    ("cache",),
+    callback=lambda: _cache_counts("misses"),
+    kind="counter",
+)
+metrics.gauge(
+    "cache_hit_ratio",
+    "Share of cache lookups that found an entry since the start",
+    ("cache",),
+    callback=_cache_hit_ratios,
+)
@@ -0,0 +1,260 @@
+import hashlib
+import zlib
+from collections.abc import Collection, Sequence
+from typing import Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    # Emits everything compressed so far, keeping the stream open
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        # wbits 31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> set[str]:
+    encodings = {"gzip"}
+    if brotli is not None:
+        encodings.add("br")
+    if zstandard is not None:
+        encodings.add("zstd")
+    return encodings
+
+
+def select_encoding(accept_encoding: str, preferred: Sequence[str]) -> Optional[str]:
+    """
+    Picks the first of the server's `preferred` encodings that the Accept-Encoding
+    header accepts, or None to send the response as is.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    for encoding in preferred:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best encoding that both the client and the server
+    support, among gzip, brotli and zstd (the latter two when their packages are
+    installed).
+
+    Only responses with an allowed content type and a body of at least `minimum_size`
+    bytes are compressed; streamed responses are compressed chunk by chunk and
+    flushed after each chunk. The compressed bodies of `cache_paths` are kept, keyed
+    by a digest of the uncompressed body, so unchanged documents such as the OpenAPI
+    schema are compressed once.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        content_types: Collection[str] = ("application/json",),
+        levels: Optional[dict[str, int]] = None,
+        cache_paths: Collection[str] = (),
+        cache_maxsize: int = 64,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        supported = available_encodings()
+        self.encodings = [encoding for encoding in encodings if encoding in supported]
+        self.content_types = {content_type.lower() for content_type in content_types}
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3} | (levels or {})
+        self.cache_paths = set(cache_paths)
+        # Entries never go stale: a changed body has a different digest
+        self.cache: TTLCache[tuple[str, str, bytes], bytes] = TTLCache(
+            maxsize=cache_maxsize, ttl=float("inf")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.encodings:
+            encoding = select_encoding(
+                Headers(scope=scope).get("accept-encoding", ""), self.encodings
+            )
+            if encoding is not None:
+                responder = CompressionResponder(self, encoding, scope["path"])
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    def compressor(self, encoding: str) -> Compressor:
+        level = self.levels[encoding]
+        if encoding == "br":
+            return BrotliCompressor(level)
+        if encoding == "zstd":
+            return ZstdCompressor(level)
+        return GzipCompressor(level)
+
+    def is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").partition(";")[0].strip()
+        return content_type.lower() in self.content_types
+
+
+class CompressionResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: str, path: str
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.path = path
+        self.send: Send = unattached_send
+        self.initial_message: Message = {}
+        self.started = False
+        self.compressible = False
+        self.compressor: Optional[Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers back until the first body chunk tells whether
+            # the response is worth compressing
+            self.initial_message = message
+            self.compressible = self.middleware.is_compressible(
+                Headers(raw=message["headers"])
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if self.compressible:
+                headers.add_vary_header("Accept-Encoding")
+
+            if not self.compressible or (
+                not more_body and len(body) < self.middleware.minimum_size
+            ):
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoding
+            if not more_body:
+                body = self.compress_whole(body)
+                headers["Content-Length"] = str(len(body))
+                message["body"] = body
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            del headers["Content-Length"]
+            self.compressor = self.middleware.compressor(self.encoding)
+            await self.send(self.initial_message)
+
+        if self.compressor is None:
+            await self.send(message)
+            return
+
+        chunk = self.compressor.compress(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        message["body"] = chunk
+        await self.send(message)
+
+    def compress_whole(self, body: bytes) -> bytes:
+        if self.path not in self.middleware.cache_paths:
+            return self._compress(body)
+
+        key = (
+            self.path,
+            self.encoding,
+            hashlib.blake2b(body, digest_size=16).digest(),
+        )
+        compressed = self.middleware.cache.get(key)
+        if compressed is None:
+            compressed = self._compress(body)
+            self.middleware.cache.set(key, compressed)
+        return compressed
+
+    def _compress(self, body: bytes) -> bytes:
+        compressor = self.middleware.compressor(self.encoding)
+        return compressor.compress(body) + compressor.finish()
+
+
+async def unattached_send(message: Message) -> None:
+    raise RuntimeError("send awaitable not set")  # pragma: no cover
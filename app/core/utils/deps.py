@@ -1,29 +1,28 @@
 from collections.abc import Generator, AsyncGenerator
 from typing import Annotated, Any
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from jose import JWTError, jwt
 from pydantic import ValidationError
 from sqlmodel import Session
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import async_engine
+from app.core.db import async_engine, async_session_maker, replica_router
+from app.core.utils.cache import TTLCache, observe_cache
 from app.core.utils.generic_models import RoleEnum
+from app.core.utils.instrumentation import record_timing
 from app.auth.models import User
 from app.auth.schemas import TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_STR}/auth/login")
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session = async_sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
-    async with async_session() as session:
+    async with async_session_maker() as session:
         yield session
 
 
@@ -31,18 +30,45 @@ SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+# Per-process cache of user rows keyed by id, invalidated by AuthCrud writes.
+# Other workers only see a change once the entry expires.
+user_cache: TTLCache[UUID, dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+observe_cache("user", user_cache)
+
+
 async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    with record_timing("auth"):
+        return await _authenticate(session=session, token=token)
+
+
+async def _authenticate(session: AsyncSession, token: str) -> User:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = security.decode_access_token(token)
         token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
+    except (ValueError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = await session.get(User, token_data.sub)
+
+    if (
+        settings.AUTH_STATELESS_TOKENS
+        and token_data.role is not None
+        and token_data.is_active is not None
+    ):
+        user = User(
+            id=token_data.sub,
+            username=token_data.username,
+            email=token_data.email,
+            role=token_data.role,
+            is_active=token_data.is_active,
+            hashed_password="",
+        )
+    else:
+        user = await get_user_by_id(session=session, user_id=token_data.sub)
+
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -50,9 +76,47 @@ async def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+async def get_user_by_id(session: AsyncSession, user_id: UUID | None) -> User | None:
+    """
+    Returns the user with the given id, served from `user_cache` when possible.
+
+    Cache hits build a fresh, session-less `User` so that requests never share an instance.
+    """
+    if user_id is None:
+        return None
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return User(**cached)
+
+    user = await session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, user.model_dump())
+    return user
+
+
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
 
 
+async def get_read_async_session(
+    session: SessionDep, current_user: CurrentUserDep
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yields a session on a read replica, or the request's primary session when no
+    replica is configured or the user wrote recently.
+    """
+    session_maker = replica_router.session_maker_for(current_user.id)
+    if session_maker is None:
+        yield session
+        return
+
+    async with session_maker() as read_session:
+        yield read_session
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_async_session)]
+
+
 async def get_current_admin(current_user: CurrentUserDep) -> User:
     if not current_user.role == RoleEnum.ADMIN:
         raise HTTPException(
@@ -0,0 +1,288 @@
+import asyncio
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+from .metrics import Labels, metrics
+
+HTTP_REQUESTS = metrics.counter(
+    "http_requests_total",
+    "HTTP requests handled",
+    ("method", "route", "tag", "status"),
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the HTTP response",
+    ("method", "route", "tag"),
+)
+HTTP_REQUEST_DB_STATEMENTS = metrics.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request",
+    ("method", "route", "tag"),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50),
+)
+DB_STATEMENT_DURATION = metrics.histogram(
+    "db_statement_duration_seconds", "Time spent executing SQL statements"
+)
+DB_POOL_WAIT = metrics.histogram(
+    "db_pool_wait_seconds",
+    "Time spent getting a connection from the pool, including new connections",
+)
+DB_POOL_WAITERS = metrics.gauge(
+    "db_pool_waiters", "Connection checkouts in progress", ("pool",)
+)
+EVENT_LOOP_LAG = metrics.gauge(
+    "event_loop_lag_seconds", "Latest delay of a timer callback on the event loop"
+)
+EVENT_LOOP_LAG_HISTOGRAM = metrics.histogram(
+    "event_loop_lag_distribution_seconds",
+    "Delays of timer callbacks on the event loop",
+)
+
+# Instrumented engines by pool label, read when the pool gauges are collected
+_engines: dict[str, AsyncEngine] = {}
+
+
+def _pool_gauge(method: str) -> dict[Labels, float]:
+    values: dict[Labels, float] = {}
+    for name, engine in list(_engines.items()):
+        # Pools without a fixed size, such as NullPool, do not report these
+        read = getattr(engine.sync_engine.pool, method, None)
+        if read is not None:
+            values[(name,)] = read()
+    return values
+
+
+metrics.gauge(
+    "db_pool_size",
+    "Configured size of the connection pool",
+    ("pool",),
+    callback=lambda: _pool_gauge("size"),
+)
+metrics.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ("pool",),
+    callback=lambda: _pool_gauge("checkedout"),
+)
+metrics.gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size",
+    ("pool",),
+    callback=lambda: _pool_gauge("overflow"),
+)
+
+
+# Scope of the request each task is handling, for reports made from other threads
+_task_scopes: "WeakKeyDictionary[asyncio.Task, Scope]" = WeakKeyDictionary()
+
+
+def task_route(task: Optional[asyncio.Task]) -> str:
+    """
+    Describes the request `task` is handling as "METHOD /route/{template}", falling
+    back to the raw path before routing. Safe to call from any thread.
+    """
+    try:
+        scope = _task_scopes.get(task) if task is not None else None  # type: ignore
+    except RuntimeError:
+        # The dict changed size under us, on the event loop thread
+        scope = None
+    if scope is None:
+        return "unknown"
+    route = scope.get("route")
+    return f'{scope["method"]} {getattr(route, "path", scope["path"])}'
+
+
+@dataclass
+class RequestStats:
+    """
+    Where the time of one request went, collected while it is handled.
+    """
+
+    start: float = field(default_factory=time.perf_counter)
+    db_statements: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    # Other named phases (auth, serialise, ...), in seconds
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def server_timing(self) -> str:
+        """
+        Renders the stats as a Server-Timing header value, with durations in ms.
+        """
+        entries = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_statements} queries"',
+            f"pool;dur={self.pool_wait * 1000:.2f}",
+        ]
+        entries.extend(
+            f"{name};dur={duration * 1000:.2f}"
+            for name, duration in self.timings.items()
+        )
+        entries.append(f"app;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+@contextmanager
+def record_timing(name: str) -> Iterator[None]:
+    """
+    Adds the time spent in the block to the current request's `name` timing.
+    """
+    stats = request_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.timings[name] = (
+                stats.timings.get(name, 0.0) + time.perf_counter() - start
+            )
+
+
+def _before_cursor_execute(conn: Any, *args: Any) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, *args: Any) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_STATEMENT_DURATION.observe(elapsed)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_time += elapsed
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Times every SQL statement and every pool checkout of `engine`, and reports
+    its pool in the pool gauges under the `name` label.
+
+    The events run in the greenlet of the awaiting task, so they see its
+    `request_stats`. Checkouts are timed by wrapping the pool's `connect`, as the
+    pool has no event firing before a checkout; a pool replaced by `dispose()`
+    is no longer timed.
+    """
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+    _engines[name] = engine
+
+    pool = sync_engine.pool
+    connect = pool.connect
+    labels = (name,)
+
+    def timed_connect() -> Any:
+        start = time.perf_counter()
+        DB_POOL_WAITERS.inc(labels)
+        try:
+            return connect()
+        finally:
+            DB_POOL_WAITERS.dec(labels)
+            elapsed = time.perf_counter() - start
+            DB_POOL_WAIT.observe(elapsed)
+            stats = request_stats.get()
+            if stats is not None:
+                stats.pool_wait += elapsed
+
+    pool.connect = timed_connect  # type: ignore
+
+
+class InstrumentationMiddleware:
+    """
+    Collects the `RequestStats` of every HTTP request, records them in the
+    per-route metrics and, when `server_timing` is set, reports them in a
+    Server-Timing header.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+        task = asyncio.current_task()
+        if task is not None:
+            _task_scopes[task] = scope
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            request_stats.reset(token)
+            if task is not None:
+                _task_scopes.pop(task, None)
+            # The matched route is set on the scope by the router
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            tags = getattr(route, "tags", None)
+            labels = (scope["method"], path, str(tags[0]) if tags else "")
+
+            HTTP_REQUESTS.inc(labels + (str(status_code),))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - stats.start, labels)
+            HTTP_REQUEST_DB_STATEMENTS.observe(stats.db_statements, labels)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late a timer scheduled every `interval` seconds fires, which is
+    how long the event loop was kept from running its callbacks.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            EVENT_LOOP_LAG.set(lag)
+            EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
+
+
+loop_lag_monitor = LoopLagMonitor(interval=settings.METRICS_LOOP_LAG_INTERVAL_SECONDS)
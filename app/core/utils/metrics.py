@@ -0,0 +1,246 @@
+import math
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from typing import Literal, Optional, TypeVar, Union
+
+Labels = tuple[str, ...]
+
+# Latency buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+class _Metric:
+    kind: str = "untyped"
+
+    def __init__(
+        self, name: str, description: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        # Rendered label sets, built once per series
+        self._label_strings: dict[Labels, str] = {}
+
+    def label_string(self, labels: Labels, extra: str = "") -> str:
+        rendered = self._label_strings.get(labels)
+        if rendered is None:
+            rendered = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, labels)
+            )
+            self._label_strings[labels] = rendered
+        if extra:
+            rendered = f"{rendered},{extra}" if rendered else extra
+        return f"{{{rendered}}}" if rendered else ""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.description)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return lines
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing value per label set.
+
+    Metrics are updated from the event loop thread only, so plain dict updates
+    need no lock.
+    """
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, description: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{self.label_string(labels)} {format_value(value)}"
+            for labels, value in list(self.values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """
+    A value per label set that goes up and down, either set directly or read from
+    `callback` at collection time.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], dict[Labels, float]]] = None,
+        kind: Literal["gauge", "counter"] = "gauge",
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self.values: dict[Labels, float] = {}
+        self.callback = callback
+        # Callbacks may expose totals kept elsewhere, which are counters
+        self.kind = kind
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self.values[labels] = value
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def samples(self) -> list[str]:
+        values = self.callback() if self.callback is not None else self.values
+        return [
+            f"{self.name}{self.label_string(labels)} {format_value(value)}"
+            for labels, value in list(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Counts of observations per bucket, with their sum and count, per label set.
+    Bucket counts are kept per bucket and only made cumulative when read.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_labels = [
+            f'le="{format_value(bound)}"' for bound in self.buckets
+        ] + ['le="+Inf"']
+        # labels -> [bucket counts (the last one is +Inf), sum, count]
+        self.values: dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, (counts, total, count) in list(self.values.items()):
+            cumulative = 0
+            for bucket_label, bucket_count in zip(self._bucket_labels, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{self.label_string(labels, bucket_label)} "
+                    f"{cumulative}"
+                )
+            label_string = self.label_string(labels)
+            lines.append(f"{self.name}_sum{label_string} {format_value(total)}")
+            lines.append(f"{self.name}_count{label_string} {count}")
+        return lines
+
+
+Metric = Union[Counter, Gauge, Histogram]
+M = TypeVar("M", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self._rendered: tuple[float, bytes] = (-math.inf, b"")
+
+    def counter(
+        self, name: str, description: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], dict[Labels, float]]] = None,
+        kind: Literal["gauge", "counter"] = "gauge",
+    ) -> Gauge:
+        return self._register(Gauge(name, description, labelnames, callback, kind))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def _register(self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self, max_age: float = 0.0) -> bytes:
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        The output is reused for `max_age` seconds, so that several scrapers, or a
+        short scrape interval, cost one rendering.
+        """
+        rendered_at, rendered = self._rendered
+        now = time.monotonic()
+        if now - rendered_at < max_age:
+            return rendered
+
+        lines: list[str] = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        rendered = ("\n".join(lines) + "\n").encode()
+        self._rendered = (now, rendered)
+        return rendered
+
+
+metrics = MetricsRegistry()
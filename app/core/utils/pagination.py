@@ -0,0 +1,119 @@
+import base64
+import binascii
+import json
+import struct
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+# (timestamp, id) of the last change a client has seen
+SyncPosition = tuple[datetime, UUID]
+
+
+def encode_cursor(last_id: UUID) -> str:
+    """
+    Encodes the id of the last row of a page into an opaque, url-safe cursor.
+    """
+    return base64.urlsafe_b64encode(last_id.bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> UUID:
+    """
+    Decodes a cursor produced by `encode_cursor` back into the row id.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return UUID(bytes=base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeEncodeError, ValueError):
+        raise ValueError("Invalid Cursor")
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_position_cursor(position: SyncPosition) -> str:
+    """
+    Encodes the (timestamp, id) of the last row of a page into an opaque, url-safe
+    cursor, for pages ordered by a timestamp column.
+    """
+    timestamp, last_id = position
+    micros = (timestamp - _EPOCH) // timedelta(microseconds=1)
+    raw = struct.pack(">q", micros) + last_id.bytes
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_position_cursor(cursor: str) -> SyncPosition:
+    """
+    Decodes a cursor produced by `encode_position_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+        if len(raw) != 24:
+            raise ValueError("Invalid Cursor")
+        (micros,) = struct.unpack(">q", raw[:8])
+        return _EPOCH + timedelta(microseconds=micros), UUID(bytes=raw[8:])
+    except (binascii.Error, UnicodeEncodeError, ValueError, OverflowError, struct.error):
+        raise ValueError("Invalid Cursor")
+
+
+def encode_sync_token(
+    changed: Optional[SyncPosition],
+    deleted: Optional[SyncPosition],
+    synced_at: datetime,
+) -> str:
+    """
+    Encodes the positions reached in the changed and deleted todo streams into an
+    opaque token, along with the time up to which every deletion was returned.
+    """
+    payload: dict[str, Any] = {
+        key: None if position is None else [position[0].isoformat(), position[1].hex]
+        for key, position in (("c", changed), ("d", deleted))
+    }
+    payload["t"] = synced_at.isoformat()
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_sync_token(
+    token: str,
+) -> tuple[Optional[SyncPosition], Optional[SyncPosition], Optional[datetime]]:
+    """
+    Decodes a token produced by `encode_sync_token`. Tokens issued before it
+    recorded the sync time have a `synced_at` of None.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        positions: list[Optional[SyncPosition]] = []
+        for key in ("c", "d"):
+            position = payload[key]
+            positions.append(
+                None
+                if position is None
+                else (datetime.fromisoformat(position[0]), UUID(hex=position[1]))
+            )
+        synced_at = payload.get("t")
+        return (
+            positions[0],
+            positions[1],
+            None if synced_at is None else datetime.fromisoformat(synced_at),
+        )
+    except (
+        binascii.Error,
+        UnicodeEncodeError,
+        ValueError,
+        KeyError,
+        TypeError,
+        AttributeError,
+    ):
+        raise ValueError("Invalid Sync Token")
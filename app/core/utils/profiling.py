@@ -0,0 +1,172 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Collection
+from types import FrameType
+from typing import Optional
+
+from app.core.config import settings
+
+from .instrumentation import task_route
+from .logger import logger_config
+from .metrics import metrics
+
+logger = logger_config(__name__)
+
+EVENT_LOOP_BLOCKS = metrics.counter(
+    "event_loop_blocks_total",
+    "Times the event loop was blocked for longer than the watchdog threshold",
+)
+
+
+class LoopWatchdog:
+    """
+    Detects callbacks that block the event loop.
+
+    The loop stamps a heartbeat every `interval` seconds; a watchdog thread checks
+    it and, when the heartbeat is older than `threshold`, captures the stack of the
+    loop thread while it is still blocked and logs it with the route of the running
+    request. Each stall is reported once.
+    """
+
+    def __init__(self, threshold: float, interval: Optional[float] = None) -> None:
+        self.threshold = threshold
+        self.interval = interval or threshold / 4
+        self.blocks = 0
+        self.last_report: Optional[str] = None
+        self._last_beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._beat()
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        self._thread.join(timeout=self.interval * 2)
+        self._thread = None
+
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        assert self._loop is not None
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            blocked_for = time.monotonic() - beat
+            if blocked_for < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self._report(blocked_for)
+
+    def _report(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)  # type: ignore
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+
+        self.blocks += 1
+        EVENT_LOOP_BLOCKS.inc()
+        self.last_report = stack
+        logger.warning(
+            "Event loop blocked for more than %.0f ms while handling %s\n%s",
+            blocked_for * 1000,
+            task_route(task),
+            stack,
+        )
+
+
+def _short_path(filename: str) -> str:
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            return filename[len(path) + 1 :]
+    return filename
+
+
+def _collapse(frame: Optional[FrameType], thread_name: str) -> str:
+    functions = []
+    while frame is not None:
+        code = frame.f_code
+        functions.append(
+            f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    functions.append(thread_name)
+    return ";".join(reversed(functions))
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the process's threads at a fixed interval and aggregates
+    them as collapsed stacks ("thread;outer;...;inner count" lines), the input of
+    flamegraph.pl, speedscope and similar tools. Only one profile runs at a time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+        self,
+        seconds: float,
+        interval: float = 0.005,
+        thread_ids: Optional[Collection[int]] = None,
+    ) -> str:
+        """
+        Blocks for `seconds` while sampling, so it must run off the event loop.
+
+        Raises:
+            RuntimeError: If a profile is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            samples: collections.Counter[str] = collections.Counter()
+            sampler_id = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == sampler_id or (
+                        thread_ids is not None and thread_id not in thread_ids
+                    ):
+                        continue
+                    samples[_collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+                time.sleep(interval)
+
+            return "".join(
+                f"{stack} {count}\n" for stack, count in samples.most_common()
+            )
+        finally:
+            self._lock.release()
+
+
+loop_watchdog = LoopWatchdog(threshold=settings.LOOP_WATCHDOG_THRESHOLD_SECONDS)
+profiler = SamplingProfiler()
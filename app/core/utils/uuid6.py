@@ -6,7 +6,10 @@ https://github.com/uuid6/uuid6-ietf-draft.
 Repo: https://github.com/oittaa/uuid6-python
 """
 
+import os
 import secrets
+import struct
+import threading
 import time
 import uuid
 from typing import Optional
@@ -37,6 +40,7 @@ class UUID(uuid.UUID):
                 version=version,
                 is_safe=is_safe,
             )
+            return
         if not 0 <= int < 1 << 128:
             raise ValueError("int is out of range (need a 128-bit value)")
         if version is not None:
@@ -78,6 +82,58 @@ def _subsec_encode(value: int) -> int:
 _last_v6_timestamp = None
 _last_v7_timestamp = None
 
+# uuid7 state: the last timestamp handed out, in ns, and a buffer of 54-bit
+# random values drawn from os.urandom in blocks, both guarded by _v7_lock
+_v7_lock = threading.Lock()
+_RANDOM_BLOCK = 4096
+_random_pool: list[int] = []
+
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+_SAFE_UNKNOWN = uuid.SafeUUID.unknown
+
+
+def _reset_v7_state() -> None:
+    global _v7_lock
+    # A forked child must not hand out the random values its parent buffered
+    _v7_lock = threading.Lock()
+    _random_pool.clear()
+
+
+os.register_at_fork(after_in_child=_reset_v7_state)
+
+
+def _fill_random_pool() -> None:
+    _random_pool.extend(
+        value >> 10
+        for (value,) in struct.iter_unpack(">Q", os.urandom(8 * _RANDOM_BLOCK))
+    )
+
+
+def _from_int(value: int) -> UUID:
+    """
+    Builds a UUID from an int that already carries its version and variant,
+    without the validation of `UUID.__init__`.
+    """
+    instance = _new_object(UUID)
+    _set_attribute(instance, "int", value)
+    _set_attribute(instance, "is_safe", _SAFE_UNKNOWN)
+    return instance
+
+
+def _v7_int(nanoseconds: int, rand: int) -> int:
+    timestamp_ms, timestamp_ns = divmod(nanoseconds, 10**6)
+    # One ns adds at least 1 to the 20-bit subsec, so ids sort by timestamp
+    subsec = _subsec_encode(timestamp_ns)
+    return (
+        (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | (subsec >> 8) << 64
+        | 0x2 << 62
+        | (subsec & 0xFF) << 54
+        | rand
+    )
+
 
 def uuid6(clock_seq: Optional[int] = None) -> UUID:
     r"""UUID version 6 is a field-compatible version of UUIDv1, reordered for
@@ -115,21 +171,40 @@ def uuid7() -> UUID:
     seconds excluded.  As well as improved entropy characteristics over
     versions 1 or 6.
     Implementations SHOULD utilize UUID version 7 over UUID version 1 and
-    6 if possible."""
+    6 if possible.
+
+    Ids are strictly increasing within the process, across threads."""
 
     global _last_v7_timestamp
 
-    nanoseconds = time.time_ns()
-    if _last_v7_timestamp is not None and nanoseconds <= _last_v7_timestamp:
-        nanoseconds = _last_v7_timestamp + 1
-    _last_v7_timestamp = nanoseconds
-    timestamp_ms, timestamp_ns = divmod(nanoseconds, 10**6)
-    subsec = _subsec_encode(timestamp_ns)
-    subsec_a = subsec >> 8
-    subsec_b = subsec & 0xFF
-    rand = secrets.randbits(54)
-    uuid_int = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
-    uuid_int |= subsec_a << 64
-    uuid_int |= subsec_b << 54
-    uuid_int |= rand
-    return UUID(int=uuid_int, version=7)
\ No newline at end of file
+    with _v7_lock:
+        nanoseconds = time.time_ns()
+        if _last_v7_timestamp is not None and nanoseconds <= _last_v7_timestamp:
+            nanoseconds = _last_v7_timestamp + 1
+        _last_v7_timestamp = nanoseconds
+        if not _random_pool:
+            _fill_random_pool()
+        rand = _random_pool.pop()
+    return _from_int(_v7_int(nanoseconds, rand))
+
+
+def uuid7_batch(count: int) -> list[UUID]:
+    r"""Returns `count` increasing version 7 UUIDs, taking the lock once, for
+    bulk inserts."""
+
+    global _last_v7_timestamp
+
+    if count <= 0:
+        return []
+    with _v7_lock:
+        start = time.time_ns()
+        if _last_v7_timestamp is not None and start <= _last_v7_timestamp:
+            start = _last_v7_timestamp + 1
+        _last_v7_timestamp = start + count - 1
+        while len(_random_pool) < count:
+            _fill_random_pool()
+        rands = _random_pool[-count:]
+        del _random_pool[-count:]
+    return [
+        _from_int(_v7_int(start + offset, rand)) for offset, rand in enumerate(rands)
+    ]
@@ -1,7 +1,17 @@
-from fastapi import APIRouter, Depends, status
+import asyncio
+import ipaddress
+import secrets
+import threading
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse
 from sqlmodel import select
 
-from app.core.utils.deps import SessionDep
+from app.core.config import settings
+from app.core.utils.deps import SessionDep, CurrentAdminDep
+from app.core.utils.metrics import metrics
+from app.core.utils.profiling import profiler
 from .crud import get_health
 from .models import Health
 from app.core.utils.logger import logger_config
@@ -13,3 +23,72 @@ logger = logger_config(__name__)
 @HealthRouter.get("/", response_model=Health)
 async def health(db: SessionDep):
     return await get_health(db=db)
+
+
+def _metrics_allowed(request: Request) -> bool:
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if (
+        settings.METRICS_TOKEN
+        and scheme.lower() == "bearer"
+        and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    ):
+        return True
+
+    if request.client is None:
+        return False
+    try:
+        address = ipaddress.ip_address(request.client.host)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+@HealthRouter.get("/metrics", response_class=Response, include_in_schema=False)
+async def metrics_route(request: Request):
+    """
+    Exposes the app metrics in the Prometheus text format, to the addresses of
+    METRICS_ALLOWED_IPS and to requests bearing METRICS_TOKEN.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not _metrics_allowed(request):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authorized to read metrics",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return Response(
+        content=metrics.render(max_age=settings.METRICS_RENDER_MAX_AGE_SECONDS),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@HealthRouter.get("/debug/profile", response_class=PlainTextResponse)
+async def profile_route(
+    current_admin: CurrentAdminDep,
+    seconds: Annotated[float, Query(gt=0, le=settings.PROFILER_MAX_SECONDS)] = 5.0,
+    threads: Literal["loop", "all"] = "loop",
+):
+    """
+    Samples the stacks of the event loop thread (or of every thread) for `seconds`
+    of live traffic and returns them as collapsed stacks, ready for flamegraph.pl
+    or speedscope. Admin only.
+    """
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    # This handler runs on the event loop thread
+    thread_ids = {threading.get_ident()} if threads == "loop" else None
+    try:
+        collapsed = await asyncio.to_thread(
+            profiler.profile, seconds, thread_ids=thread_ids
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return PlainTextResponse(collapsed)
@@ -5,18 +5,41 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
-from app.core.db import init_db
+from app.core.db import async_engine, init_db
+from app.core.migrations import check_schema
+from app.core.utils.compression import CompressionMiddleware
+from app.core.utils.fast_json import get_json_response_class
+from app.core.utils.instrumentation import (
+    InstrumentationMiddleware,
+    loop_lag_monitor,
+)
+from app.core.utils.profiling import loop_watchdog
 from app.core.utils.logger import logger_config
+from app.todo.events import todo_event_broker
+from app.todo.tombstones import tombstone_pruner
 
 logger = logger_config(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("Creating DB tables")
-    await init_db()
-    logger.info("DB tables Creation Successfull")
+    if settings.DB_INIT_ON_STARTUP:
+        logger.info("Migrating DB schema")
+        await init_db()
+        logger.info("DB schema Migration Successfull")
+    else:
+        await check_schema(async_engine)
+    await todo_event_broker.start()
+    await tombstone_pruner.start()
+    if settings.METRICS_ENABLED:
+        await loop_lag_monitor.start()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await loop_watchdog.start()
     yield
+    await loop_watchdog.stop()
+    await loop_lag_monitor.stop()
+    await tombstone_pruner.stop()
+    await todo_event_broker.stop()
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -31,6 +54,7 @@ app = FastAPI(
     docs_url=f"{settings.API_STR}/docs",
     openapi_url=f"{settings.API_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=get_json_response_class(),
     servers=[
         {"url": "http://localhost:8000", "description": "Development Server"},
         {
@@ -40,6 +64,21 @@ app = FastAPI(
     ],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        levels={
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_QUALITY,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        },
+        # The OpenAPI document only changes on deploy
+        cache_paths=[app.openapi_url] if app.openapi_url else [],
+    )
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -53,3 +92,9 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 app.include_router(api_router, prefix=settings.API_STR)
+
+# Added last so that it wraps every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        InstrumentationMiddleware, server_timing=settings.SERVER_TIMING_ENABLED
+    )
@@ -0,0 +1,173 @@
+"""
+Production launcher: one listening socket shared by several uvicorn workers.
+
+    poetry run python -m app.serve --workers 4
+
+The application and settings are imported once, then the workers are forked,
+so they share the loaded code and a SECRET_KEY generated at import time.
+Migrations and the first superuser seeding run once, before any worker starts,
+and the workers only check the schema version in their lifespan. A worker that
+dies is replaced. SIGINT / SIGTERM shut the workers down gracefully.
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+from collections.abc import Callable
+from types import FrameType
+from typing import Any, Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.utils.logger import logger_config
+
+logger = logger_config(__name__)
+
+
+def _fork(target: Callable[..., int], *args: Any) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # Children must not run the handlers of the master
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 1
+    try:
+        code = target(*args)
+    except BaseException:
+        logger.exception("Worker %s failed", os.getpid())
+    finally:
+        os._exit(code)
+
+
+def _init_db() -> int:
+    from app.cli import run_init_db
+
+    run_init_db()
+    return 0
+
+
+def init_db_once() -> None:
+    """
+    Runs `init_db` in a short-lived child process, so that the master forks its
+    workers without open connections or the threads of the password hasher.
+    """
+    _, status = os.waitpid(_fork(_init_db), 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SystemExit("DB initialisation failed")
+    settings.DB_INIT_ON_STARTUP = False
+
+
+def _serve(config: uvicorn.Config, sock: socket.socket) -> int:
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else 3
+
+
+class Supervisor:
+    """
+    Keeps `workers` uvicorn processes serving `sock`.
+
+    A worker that fails during startup stops the whole server, as its
+    replacements would most likely fail the same way.
+    """
+
+    def __init__(
+        self, config: uvicorn.Config, sock: socket.socket, workers: int
+    ) -> None:
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.pids: set[int] = set()
+        self.stopping = False
+
+    def _spawn(self) -> None:
+        pid = _fork(_serve, self.config, self.sock)
+        self.pids.add(pid)
+        logger.info("Started worker %s", pid)
+
+    def _stop(self, signum: int, frame: Optional[FrameType]) -> None:
+        self.stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+
+        exit_code = 0
+        while self.pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self.pids.discard(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            if code == 3:
+                logger.error("Worker %s failed to start, shutting down", pid)
+                exit_code = 3
+                self._stop(signal.SIGTERM, None)
+                continue
+            logger.warning("Worker %s exited with %s, restarting it", pid, code)
+            self._spawn()
+        return exit_code
+
+
+def build_config(args: argparse.Namespace) -> uvicorn.Config:
+    # Imported once the settings are final, before the workers are forked
+    from app.main import app
+
+    # "auto" picks uvloop and httptools when they are installed
+    return uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        loop="auto",
+        http="auto",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        proxy_headers=True,
+    )
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.SERVER_WORKERS or os.cpu_count() or 1,
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.workers > 1 and settings.TODO_CACHE_BACKEND is None:
+        # Per-process caches are not invalidated by writes of other workers
+        settings.TODO_CACHE_BACKEND = "none"
+    config = build_config(args)
+    if settings.DB_INIT_ON_STARTUP:
+        init_db_once()
+
+    sock = config.bind_socket()
+    logger.info(
+        "Serving on %s:%s with %s workers", args.host, args.port, args.workers
+    )
+    sys.exit(Supervisor(config, sock, args.workers).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,100 @@
-from typing import List, Annotated, Optional
+from collections.abc import AsyncGenerator, Sequence
+from typing import List, Annotated, Optional, Union
 from uuid import UUID
 
 from fastapi import HTTPException, status, Depends
-
-from sqlmodel import Session, select, and_
+from pydantic_core import to_json
+
+from sqlmodel import Session, select, and_, func, cast
+from sqlalchemy import (
+    DateTime,
+    case,
+    insert,
+    update,
+    delete,
+    values,
+    column,
+    literal,
+    literal_column,
+    tuple_,
+    select as sa_select,
+)
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.utils.deps import SessionDep
+from app.core.config import settings
+from app.core.db import replica_router
+from app.core.utils.cache import ResponseCache, create_cache_backend, observe_cache
+from app.core.utils.deps import SessionDep, ReadSessionDep
+from app.core.utils.instrumentation import record_timing
 from app.core.utils.logger import logger
-
-from .schemas import TodoCreate, TodoRead, TodoUpdate, TodoDelete, TodoOut
-from .models import Todo
-
-from datetime import datetime, timezone
+from app.core.utils.uuid6 import uuid7_batch
+from app.core.utils.pagination import (
+    SyncPosition,
+    encode_cursor,
+    encode_position_cursor,
+    encode_sync_token,
+)
+
+from .schemas import (
+    TodoCreate,
+    TodoRead,
+    TodoUpdate,
+    TodoDelete,
+    TodoOut,
+    TodoFilter,
+    TodoSortEnum,
+    TodoBatchUpdate,
+    TodoBatchItemResult,
+    TodoBatchResult,
+    BatchStatusEnum,
+    TodoChanges,
+    TodoTombstoneOut,
+    TodoStats,
+    TodoStatsBucket,
+)
+from .models import Todo, TodoTombstone, todo_search_vector
+from .events import TodoEvent, TodoEventTypeEnum, todo_event_broker
+
+from datetime import datetime, timedelta, timezone
+
+
+# Serialised todo reads, scoped per user and invalidated on every write
+todo_cache = ResponseCache(
+    backend=create_cache_backend(
+        settings.TODO_CACHE_BACKEND or "memory",
+        maxsize=settings.TODO_CACHE_MAXSIZE,
+        ttl=settings.TODO_CACHE_TTL_SECONDS,
+    ),
+    namespace="todo",
+    ttl=settings.TODO_CACHE_TTL_SECONDS,
+)
+observe_cache("todo", todo_cache)
+
+# Fields of the public representation of a todo
+_TODO_OUT_FIELDS = set(TodoOut.model_fields)
+
+
+def todo_json(todo: Todo) -> bytes:
+    """
+    Serialises a todo row straight to the JSON of its `TodoOut` representation,
+    without building an intermediate `TodoOut` or dict.
+    """
+    return todo.__pydantic_serializer__.to_json(todo, include=_TODO_OUT_FIELDS)
+
+
+def todo_page_json(todos: Sequence[Todo], next_cursor: Optional[str]) -> bytes:
+    """
+    Serialises todo rows straight to the JSON of a `TodoPage`.
+    """
+    return b"".join(
+        (
+            b'{"items":[',
+            b",".join(map(todo_json, todos)),
+            b'],"next_cursor":',
+            to_json(next_cursor),
+            b"}",
+        )
+    )
 
 
 class TodoCRUD:
@@ -20,20 +102,132 @@ class TodoCRUD:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
-    async def get_all_todos(self, user_id: UUID) -> List[Todo]:
+    async def _commit_write(
+        self,
+        user_id: UUID,
+        event_type: TodoEventTypeEnum,
+        todos: Sequence[TodoOut],
+    ) -> None:
+        """
+        Commits a write to a user's todos and does its bookkeeping.
+
+        The change events are staged in the write transaction, so that the
+        broker can have them sent by its commit. Once committed the write is
+        durable, so a failure to publish them is logged, not raised.
+        """
+        events = [TodoEvent(type=event_type, todo_id=todo.id, todo=todo) for todo in todos]
+        if events:
+            await todo_event_broker.stage(self.session, user_id, events)
+        await self.session.commit()
+
+        replica_router.mark_write(user_id)
+        await todo_cache.invalidate(str(user_id))
+        if events:
+            try:
+                await todo_event_broker.publish(user_id, events)
+            except Exception as e:
+                logger.exception(e)
+
+    async def get_all_todos(
+        self,
+        user_id: UUID,
+        limit: int = settings.TODO_PAGE_DEFAULT_LIMIT,
+        after: Optional[Union[UUID, SyncPosition]] = None,
+        filters: Optional[TodoFilter] = None,
+        validator: Optional[str] = None,
+    ) -> bytes:
         """
-        A function that retrieves all todos for a specific user based on the provided user_id.
+        A function that retrieves a page of todos for a specific user based on the provided user_id.
+
+        Pages are read with keyset range scans instead of an OFFSET: on (user_id, id)
+        for the created sorts, as todo ids are time-ordered uuid7 values, and on
+        (user_id, updated_at, id) for the updated sorts. Completion filters use the
+        (user_id, iscompleted, id) index and text search the GIN index on
+        `todo_search_vector`.
+
+        Rows are serialised straight to JSON bytes, which are also what is cached,
+        so neither a cache hit nor a miss builds any pydantic model.
 
         Parameters:
             user_id (UUID): The unique identifier of the user whose todos are to be retrieved.
+            limit (int): The maximum number of todos to return.
+            after (Optional[Union[UUID, SyncPosition]]): The id, or for the updated
+                sorts the (updated_at, id), of the last todo of the previous page.
+            filters (Optional[TodoFilter]): The filters and sort order of the list.
+            validator (Optional[str]): The ETag of the collection read from the
+                database, part of the cache key so that a page cached by this
+                process before a write made through another worker is never sent
+                with the ETag of the new state.
 
         Returns:
-            List[Todo]: A list of Todo objects associated with the user.
+            bytes: The JSON of the `TodoPage` with the todos of the page and the
+                cursor of the next page, if any.
         """
         try:
+            filters = filters or TodoFilter()
+            cache_key = (
+                f"list:{validator}:{limit}:{after}:{filters.model_dump_json()}"
+            )
+            cached, version = await todo_cache.get(str(user_id), cache_key)
+            if cached is not None:
+                return cached
+
             statement = select(Todo).where(Todo.user_id == user_id)
+            if filters.iscompleted is not None:
+                statement = statement.where(Todo.iscompleted == filters.iscompleted)
+            if filters.created_after is not None:
+                statement = statement.where(Todo.created_at >= filters.created_after)
+            if filters.created_before is not None:
+                statement = statement.where(Todo.created_at < filters.created_before)
+            if filters.updated_after is not None:
+                statement = statement.where(Todo.updated_at >= filters.updated_after)
+            if filters.updated_before is not None:
+                statement = statement.where(Todo.updated_at < filters.updated_before)
+            if filters.q is not None:
+                statement = statement.where(
+                    todo_search_vector().bool_op("@@")(
+                        func.websearch_to_tsquery(
+                            literal_column("'simple'::regconfig"), filters.q
+                        )
+                    )
+                )
+
+            descending = filters.sort in (
+                TodoSortEnum.CREATED_DESC,
+                TodoSortEnum.UPDATED_DESC,
+            )
+            if filters.sort in (TodoSortEnum.UPDATED, TodoSortEnum.UPDATED_DESC):
+                keys = (Todo.updated_at, Todo.id)
+                position = after
+            else:
+                keys = (Todo.id,)
+                position = (after,)
+            if after is not None:
+                statement = statement.where(
+                    tuple_(*keys) < tuple_(*position)  # type: ignore
+                    if descending
+                    else tuple_(*keys) > tuple_(*position)  # type: ignore
+                )
+            # Fetch one extra row to know whether another page exists
+            statement = statement.order_by(
+                *(key.desc() if descending else key for key in keys)  # type: ignore
+            ).limit(limit + 1)
             result = (await self.session.exec(statement)).all()
-            return list(result)
+
+            todos = result[:limit]
+            next_cursor = None
+            if len(result) > limit:
+                last = todos[-1]
+                next_cursor = (
+                    encode_position_cursor((last.updated_at, last.id))
+                    if len(keys) == 2
+                    else encode_cursor(last.id)
+                )
+
+            with record_timing("serialise"):
+                page = todo_page_json(todos, next_cursor)
+            await todo_cache.set(str(user_id), cache_key, page, version)
+            return page
 
         except Exception as e:
             logger.info(str(e))
@@ -42,7 +236,266 @@ class TodoCRUD:
                 detail="Error Getting Todos",
             )
 
-    async def get_todo(self, todo_id: UUID, user_id: UUID) -> Optional[Todo]:
+    async def get_stats(
+        self,
+        user_id: UUID,
+        bucket: str = "day",
+        since: Optional[datetime] = None,
+    ) -> TodoStats:
+        """
+        Computes a user's todo counts and a histogram of created and completed todos
+        per time bucket, without loading any row.
+
+        Everything comes from one GROUPING SETS query over date_trunc buckets: the
+        empty set yields the totals, the created_at buckets the created counts and
+        the updated_at buckets of completed todos the completed counts (completion
+        time is not recorded, so the last update of a completed todo stands in for it).
+
+        Parameters:
+            user_id (UUID): The unique identifier of the user.
+            bucket (str): The date_trunc unit of the histogram (day, week or month).
+            since (Optional[datetime]): Only count todos created at or after this time.
+
+        Returns:
+            TodoStats: The counts, the completion ratio and the histogram.
+        """
+        try:
+            cache_key = f"stats:{bucket}:{since}"
+            cached, version = await todo_cache.get(str(user_id), cache_key)
+            if cached is not None:
+                return TodoStats.model_validate_json(cached)
+
+            # The unit is rendered inline so that the select list and the
+            # grouping sets share one expression; it is one of a fixed set of values
+            unit = literal_column(f"'{bucket}'")
+            is_completed = Todo.iscompleted.is_(True)  # type: ignore
+            created_bucket = func.date_trunc(unit, Todo.created_at)
+            completed_bucket = case(
+                (is_completed, func.date_trunc(unit, Todo.updated_at))
+            )
+
+            statement = select(
+                func.grouping(created_bucket),
+                func.grouping(completed_bucket),
+                created_bucket,
+                completed_bucket,
+                func.count(),
+                func.count().filter(is_completed),
+            ).where(Todo.user_id == user_id)
+            if since is not None:
+                statement = statement.where(Todo.created_at >= since)
+            statement = statement.group_by(
+                func.grouping_sets(
+                    tuple_(), tuple_(created_bucket), tuple_(completed_bucket)
+                )
+            )
+            rows = (await self.session.exec(statement)).all()
+
+            total = completed = 0
+            histogram: dict[datetime, dict[str, int]] = {}
+            for (
+                created_grouped,
+                completed_grouped,
+                created_start,
+                completed_start,
+                count,
+                completed_count,
+            ) in rows:
+                if created_grouped and completed_grouped:
+                    total, completed = count, completed_count
+                elif not created_grouped:
+                    histogram.setdefault(created_start, {"created": 0, "completed": 0})[
+                        "created"
+                    ] = count
+                elif completed_start is not None:
+                    histogram.setdefault(
+                        completed_start, {"created": 0, "completed": 0}
+                    )["completed"] = count
+
+            stats = TodoStats(
+                total=total,
+                completed=completed,
+                pending=total - completed,
+                completion_ratio=completed / total if total else 0.0,
+                bucket=bucket,
+                histogram=[
+                    TodoStatsBucket(start=start, **counts)
+                    for start, counts in sorted(histogram.items())
+                ],
+            )
+            await todo_cache.set(
+                str(user_id), cache_key, stats.model_dump_json().encode(), version
+            )
+            return stats
+
+        except Exception as e:
+            logger.info(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error Getting Todo Stats",
+            )
+
+    async def get_changes(
+        self,
+        user_id: UUID,
+        since: tuple[Optional[SyncPosition], Optional[SyncPosition]] = (None, None),
+        synced_at: Optional[datetime] = None,
+        limit: int = settings.TODO_SYNC_MAX_CHANGES,
+    ) -> TodoChanges:
+        """
+        Retrieves the todos created or updated, and the todos deleted, since a sync position.
+
+        Both streams are read with keyset range scans on (user_id, updated_at, id)
+        and (user_id, deleted_at, id), so a poll costs O(changes) rather than
+        O(total todos).
+
+        Parameters:
+            user_id (UUID): The unique identifier of the user.
+            since (tuple): The positions already reached in the changed and deleted streams.
+            synced_at (Optional[datetime]): The time up to which the client has seen
+                every deletion, None on a first sync.
+            limit (int): The maximum number of changes of each kind to return.
+
+        Returns:
+            TodoChanges: The changes, the token to resume from and whether more changes remain.
+
+        Raises:
+            HTTPException: 410 when the tombstones the client needs may have been
+                pruned, in which case it must sync again from scratch.
+        """
+        try:
+            since_changed, since_deleted = since
+            now = datetime.utcnow()
+            if since != (None, None) or synced_at is not None:
+                retained_after = now - timedelta(
+                    days=settings.TODO_TOMBSTONE_RETENTION_DAYS
+                )
+                if synced_at is None or synced_at < retained_after:
+                    raise HTTPException(
+                        status_code=status.HTTP_410_GONE, detail="Sync Token Expired"
+                    )
+            settled_before = now - timedelta(seconds=settings.TODO_SYNC_SETTLE_SECONDS)
+
+            changed_statement = select(Todo).where(Todo.user_id == user_id)
+            if since_changed is not None:
+                changed_statement = changed_statement.where(
+                    tuple_(Todo.updated_at, Todo.id) > tuple_(*since_changed)
+                )
+            if settings.TODO_SYNC_SETTLE_SECONDS > 0:
+                changed_statement = changed_statement.where(
+                    Todo.updated_at <= settled_before
+                )
+            changed_statement = changed_statement.order_by(
+                Todo.updated_at, Todo.id
+            ).limit(limit + 1)
+            changed = (await self.session.exec(changed_statement)).all()
+
+            deleted_statement = select(TodoTombstone).where(
+                TodoTombstone.user_id == user_id
+            )
+            if since_deleted is not None:
+                deleted_statement = deleted_statement.where(
+                    tuple_(TodoTombstone.deleted_at, TodoTombstone.id)
+                    > tuple_(*since_deleted)
+                )
+            if settings.TODO_SYNC_SETTLE_SECONDS > 0:
+                deleted_statement = deleted_statement.where(
+                    TodoTombstone.deleted_at <= settled_before
+                )
+            deleted_statement = deleted_statement.order_by(
+                TodoTombstone.deleted_at, TodoTombstone.id
+            ).limit(limit + 1)
+            deleted = (await self.session.exec(deleted_statement)).all()
+
+            has_more = len(changed) > limit or len(deleted) > limit
+            # Every deletion up to the settle horizon is returned, unless the
+            # deleted stream was cut short
+            synced_at = (
+                deleted[limit - 1].deleted_at if len(deleted) > limit else settled_before
+            )
+            changed, deleted = changed[:limit], deleted[:limit]
+            if changed:
+                since_changed = (changed[-1].updated_at, changed[-1].id)
+            if deleted:
+                since_deleted = (deleted[-1].deleted_at, deleted[-1].id)
+
+            return TodoChanges(
+                changed=[TodoOut(**todo.model_dump()) for todo in changed],
+                deleted=[
+                    TodoTombstoneOut(id=tombstone.id, deleted_at=tombstone.deleted_at)
+                    for tombstone in deleted
+                ],
+                next_token=encode_sync_token(since_changed, since_deleted, synced_at),
+                has_more=has_more,
+            )
+
+        except HTTPException as e:
+            logger.info(str(e))
+            raise e
+
+        except Exception as e:
+            logger.info(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error Getting Todo Changes",
+            )
+
+    async def get_todos_validator(
+        self, user_id: UUID
+    ) -> tuple[int, Optional[datetime]]:
+        """
+        Computes a cheap validator of a user's todo collection without loading any row.
+
+        Parameters:
+            user_id (UUID): The unique identifier of the user.
+
+        Returns:
+            tuple[int, Optional[datetime]]: The number of todos and the latest `updated_at`.
+        """
+        try:
+            statement = select(func.count(), func.max(Todo.updated_at)).where(
+                Todo.user_id == user_id
+            )
+            count, last_updated = (await self.session.exec(statement)).one()
+            return count, last_updated
+
+        except Exception as e:
+            logger.info(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error Getting Todos",
+            )
+
+    async def stream_todos(self, user_id: UUID) -> AsyncGenerator[bytes, None]:
+        """
+        Streams the JSON of every todo of a specific user, in creation order, through
+        a server-side cursor.
+
+        Rows are fetched in chunks of `TODO_EXPORT_CHUNK_SIZE`, so memory stays flat
+        regardless of how many todos the user owns. The request session is closed
+        before a streaming response is sent, so the stream runs on its own session
+        bound to the same engine.
+
+        Parameters:
+            user_id (UUID): The unique identifier of the user whose todos are to be streamed.
+
+        Yields:
+            bytes: The JSON of the `TodoOut` of each todo of the user, one at a time.
+        """
+        async with AsyncSession(
+            bind=self.session.bind, expire_on_commit=False
+        ) as session:
+            statement = (
+                select(Todo)
+                .where(Todo.user_id == user_id)
+                .order_by(Todo.id)
+                .execution_options(yield_per=settings.TODO_EXPORT_CHUNK_SIZE)
+            )
+            result = await session.stream_scalars(statement)
+            async for todo in result:
+                yield todo_json(todo)
+
+    async def get_todo(self, todo_id: UUID, user_id: UUID) -> Optional[TodoOut]:
         """
         Asynchronously retrieves a specific todo item based on the provided todo_id and user_id.
 
@@ -51,14 +504,26 @@ class TodoCRUD:
             user_id (UUID): The unique identifier of the user who owns the todo item.
 
         Returns:
-            Todo: The todo item corresponding to the provided todo_id and user_id.
+            TodoOut: The todo item corresponding to the provided todo_id and user_id.
         """
         try:
+            cache_key = f"item:{todo_id}"
+            cached, version = await todo_cache.get(str(user_id), cache_key)
+            if cached is not None:
+                return TodoOut.model_validate_json(cached)
+
             statement = select(Todo).where(
                 and_(Todo.user_id == user_id, Todo.id == todo_id)
             )
             result = (await self.session.exec(statement)).first()
-            return result
+            if result is None:
+                return None
+
+            todo = TodoOut(**result.model_dump())
+            await todo_cache.set(
+                str(user_id), cache_key, todo.model_dump_json().encode(), version
+            )
+            return todo
 
         except Exception as e:
             logger.info(str(e))
@@ -75,6 +540,9 @@ class TodoCRUD:
         """
         A function to add a new todo item for a specific user, returning the added todo item.
 
+        Every column value is generated in Python, so the todo is returned as
+        inserted without a refresh round-trip.
+
         Parameters:
             new_todo (TodoCreate): The new todo item to be added.
             user_id (UUID): The unique identifier of the user.
@@ -87,12 +555,13 @@ class TodoCRUD:
             validated_todo = Todo.model_validate(new_todo, update={"user_id": user_id})
 
             session.add(validated_todo)
-            await session.commit()
-            await session.refresh(validated_todo)
 
-            return TodoOut(**validated_todo.model_dump())
+            todo = TodoOut(**validated_todo.model_dump())
+            await self._commit_write(user_id, TodoEventTypeEnum.CREATED, [todo])
+            return todo
 
         except Exception as e:
+            await self.session.rollback()
             logger.info(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -108,7 +577,11 @@ class TodoCRUD:
         """
         A function to update a todo item based on the provided information.
 
+        Issues a single UPDATE ... RETURNING scoped to the user; no returned row
+        means the todo does not exist for this user.
+
         Parameters:
+            - todo_id: UUID - The unique identifier of the todo item to update
             - updated_todo: TodoUpdate - The updated todo object
             - user_id: UUID - The user ID associated with the todo
 
@@ -118,22 +591,38 @@ class TodoCRUD:
         try:
             session = self.session
 
-            todo_to_update = await self.get_todo(todo_id=todo_id, user_id=user_id)
+            updated_values = {
+                key: value
+                for key, value in updated_todo.model_dump().items()
+                if value is not None
+            }
+            updated_values["updated_at"] = datetime.utcnow()
+
+            statement = (
+                update(Todo)
+                .where(and_(Todo.id == todo_id, Todo.user_id == user_id))
+                .values(updated_values)
+                .returning(Todo)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            todo_to_update = (await session.exec(statement)).scalars().first()
 
             if todo_to_update is None:
+                await session.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
                 )
-            for key, value in updated_todo.model_dump().items():
-                if value is not None:
-                    setattr(todo_to_update, key, value)
 
-            setattr(todo_to_update, "updated_at", datetime.utcnow())
-            await session.commit()
-            await session.refresh(todo_to_update)
-            return TodoOut(**todo_to_update.model_dump())
+            todo = TodoOut(**todo_to_update.model_dump())
+            await self._commit_write(user_id, TodoEventTypeEnum.UPDATED, [todo])
+            return todo
+
+        except HTTPException as e:
+            logger.info(str(e))
+            raise e
 
         except Exception as e:
+            await self.session.rollback()
             logger.info(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -144,38 +633,248 @@ class TodoCRUD:
         """
         A function to delete a specific todo item based on the provided todo_id and user_id.
 
+        Issues a single DELETE ... RETURNING scoped to the user, which also records
+        a tombstone; no returned row means the todo does not exist for this user.
+
         Parameters:
             todo_id (UUID): The unique identifier of the todo item to delete.
             user_id (UUID): The unique identifier of the user who owns the todo item.
 
         Returns:
-            None
+            TodoOut: The deleted todo item.
         """
         try:
             session = self.session
-            todo_to_delete = await self.get_todo(todo_id=todo_id, user_id=user_id)
+            deleted_rows = await self._delete_with_tombstones(
+                todo_ids=[todo_id], user_id=user_id
+            )
+            todo_to_delete = deleted_rows[0] if deleted_rows else None
             if todo_to_delete is None:
+                await session.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
                 )
-            await session.delete(todo_to_delete)
-            await self.session.commit()
-            return TodoOut(**todo_to_delete.model_dump())
+
+            todo = TodoOut(**todo_to_delete.model_dump())
+            await self._commit_write(user_id, TodoEventTypeEnum.DELETED, [todo])
+            return todo
 
         except HTTPException as e:
             logger.info(str(e))
             raise e
 
         except Exception as e:
+            await self.session.rollback()
             logger.info(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error Deleting Todo",
             )
 
+    async def _delete_with_tombstones(
+        self, todo_ids: List[UUID], user_id: UUID
+    ) -> Sequence[Todo]:
+        """
+        Deletes the user's todos with the given ids and records their tombstones in
+        the same statement, using data-modifying CTEs. Does not commit.
+        """
+        deleted = (
+            delete(Todo)
+            .where(and_(Todo.user_id == user_id, Todo.id.in_(todo_ids)))  # type: ignore
+            .returning(*Todo.__table__.c)  # type: ignore
+            .cte("deleted")
+        )
+        tombstones = (
+            insert(TodoTombstone)
+            .from_select(
+                ["id", "user_id", "deleted_at"],
+                sa_select(
+                    deleted.c.id,
+                    deleted.c.user_id,
+                    literal(datetime.utcnow(), DateTime),
+                ),
+            )
+            .cte("tombstones")
+        )
+        statement = select(Todo).from_statement(
+            sa_select(deleted).add_cte(tombstones)
+        )
+        return (await self.session.exec(statement)).scalars().all()
+
+    async def add_todos(
+        self, new_todos: List[TodoCreate], user_id: UUID
+    ) -> TodoBatchResult:
+        """
+        A function to add several todo items for a specific user with a single
+        multi-row INSERT ... RETURNING in one transaction.
+
+        Parameters:
+            new_todos (List[TodoCreate]): The new todo items to be added.
+            user_id (UUID): The unique identifier of the user.
+
+        Returns:
+            TodoBatchResult: The per-item results, in request order.
+        """
+        if not new_todos:
+            return TodoBatchResult(items=[])
+        try:
+            rows = [
+                Todo.model_validate(
+                    new_todo, update={"id": todo_id, "user_id": user_id}
+                ).model_dump()
+                for new_todo, todo_id in zip(new_todos, uuid7_batch(len(new_todos)))
+            ]
+            statement = insert(Todo).returning(Todo, sort_by_parameter_order=True)
+            created_todos = (
+                (await self.session.exec(statement, params=rows)).scalars().all()
+            )
+
+            todos = [TodoOut(**todo.model_dump()) for todo in created_todos]
+            await self._commit_write(user_id, TodoEventTypeEnum.CREATED, todos)
+            return TodoBatchResult(
+                items=[
+                    TodoBatchItemResult(
+                        id=todo.id, status=BatchStatusEnum.CREATED, todo=todo
+                    )
+                    for todo in todos
+                ]
+            )
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.info(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error Adding Todos",
+            )
+
+    async def update_todos(
+        self, updated_todos: List[TodoBatchUpdate], user_id: UUID
+    ) -> TodoBatchResult:
+        """
+        A function to update several todo items of a specific user with a single
+        UPDATE ... FROM (VALUES ...) RETURNING in one transaction.
+
+        As with `update_todo`, fields left as None keep their current value. When
+        the same id appears more than once, the last item wins.
+
+        Parameters:
+            updated_todos (List[TodoBatchUpdate]): The updated todo items, keyed by id.
+            user_id (UUID): The user ID associated with the todos.
+
+        Returns:
+            TodoBatchResult: The per-item results, in request order.
+        """
+        if not updated_todos:
+            return TodoBatchResult(items=[])
+        try:
+            updates = {todo.id: todo for todo in updated_todos}
+            columns = Todo.__table__.c  # type: ignore
+            batch = values(
+                column("id", columns.id.type),
+                column("title", columns.title.type),
+                column("description", columns.description.type),
+                column("iscompleted", columns.iscompleted.type),
+                name="batch",
+            ).data(
+                [
+                    (todo.id, todo.title, todo.description, todo.iscompleted)
+                    for todo in updates.values()
+                ]
+            )
+
+            statement = (
+                update(Todo)
+                .where(and_(Todo.id == batch.c.id, Todo.user_id == user_id))
+                .values(
+                    {
+                        # Casts keep the column types when a VALUES column is all NULL
+                        name: func.coalesce(
+                            cast(batch.c[name], columns[name].type), columns[name]
+                        )
+                        for name in ("title", "description", "iscompleted")
+                    }
+                    | {"updated_at": datetime.utcnow()}
+                )
+                .returning(Todo)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            updated_rows = (await self.session.exec(statement)).scalars().all()
+
+            found = {todo.id: TodoOut(**todo.model_dump()) for todo in updated_rows}
+            await self._commit_write(
+                user_id, TodoEventTypeEnum.UPDATED, list(found.values())
+            )
+            return TodoBatchResult(
+                items=[
+                    _batch_item(todo_id, found.get(todo_id), BatchStatusEnum.UPDATED)
+                    for todo_id in updates
+                ]
+            )
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.info(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error Updating Todos",
+            )
+
+    async def delete_todos(self, todo_ids: List[UUID], user_id: UUID) -> TodoBatchResult:
+        """
+        A function to delete several todo items of a specific user, recording their
+        tombstones, with a single DELETE ... RETURNING in one transaction.
+
+        Parameters:
+            todo_ids (List[UUID]): The unique identifiers of the todo items to delete.
+            user_id (UUID): The unique identifier of the user who owns the todo items.
+
+        Returns:
+            TodoBatchResult: The per-item results, in request order.
+        """
+        if not todo_ids:
+            return TodoBatchResult(items=[])
+        try:
+            unique_ids = list(dict.fromkeys(todo_ids))
+            deleted_rows = await self._delete_with_tombstones(
+                todo_ids=unique_ids, user_id=user_id
+            )
+
+            found = {todo.id: TodoOut(**todo.model_dump()) for todo in deleted_rows}
+            await self._commit_write(
+                user_id, TodoEventTypeEnum.DELETED, list(found.values())
+            )
+            return TodoBatchResult(
+                items=[
+                    _batch_item(todo_id, found.get(todo_id), BatchStatusEnum.DELETED)
+                    for todo_id in unique_ids
+                ]
+            )
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.info(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error Deleting Todos",
+            )
+
+
+def _batch_item(
+    todo_id: UUID, todo: Optional[TodoOut], found_status: BatchStatusEnum
+) -> TodoBatchItemResult:
+    if todo is None:
+        return TodoBatchItemResult(id=todo_id, status=BatchStatusEnum.NOT_FOUND)
+    return TodoBatchItemResult(id=todo_id, status=found_status, todo=todo)
+
 
 async def get_todo_crud(session: SessionDep) -> TodoCRUD:
     return TodoCRUD(session=session)
 
 
+async def get_todo_read_crud(session: ReadSessionDep) -> TodoCRUD:
+    return TodoCRUD(session=session)
+
+
 TodoCrudDep = Annotated[TodoCRUD, Depends(get_todo_crud)]
+TodoReadCrudDep = Annotated[TodoCRUD, Depends(get_todo_read_crud)]
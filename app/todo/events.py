@@ -0,0 +1,237 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Sequence
+from enum import Enum
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.utils.logger import logger_config
+
+from .schemas import TodoOut
+
+logger = logger_config(__name__)
+
+# NOTIFY payloads must stay below 8000 bytes
+_MAX_NOTIFY_PAYLOAD = 7900
+
+
+class TodoEventTypeEnum(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class TodoEvent(SQLModel):
+    type: TodoEventTypeEnum
+    todo_id: UUID
+    todo: Optional[TodoOut] = None
+
+
+class TodoEventHub:
+    """
+    In-process fan-out of todo events to the open subscriptions of each user.
+
+    Every subscription owns a bounded queue; a subscriber that falls behind loses
+    its oldest events rather than slowing down publishers.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: defaultdict[UUID, set[asyncio.Queue[TodoEvent]]] = (
+            defaultdict(set)
+        )
+
+    def subscribe(self, user_id: UUID) -> asyncio.Queue[TodoEvent]:
+        queue: asyncio.Queue[TodoEvent] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: UUID, queue: asyncio.Queue[TodoEvent]) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def dispatch(self, user_id: UUID, events: Sequence[TodoEvent]) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            for event in events:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+class EventBroker(ABC):
+    """
+    Carries todo events from the worker that made a write to the hub of every worker.
+
+    `stage` runs inside the write transaction, before its commit, and `publish`
+    after it; a broker uses whichever gives it delivery on commit only.
+    """
+
+    def __init__(self, hub: TodoEventHub) -> None:
+        self.hub = hub
+
+    async def start(self) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+    async def stage(
+        self, session: AsyncSession, user_id: UUID, events: Sequence[TodoEvent]
+    ) -> None:
+        return None
+
+    @abstractmethod
+    async def publish(self, user_id: UUID, events: Sequence[TodoEvent]) -> None: ...
+
+
+class LocalEventBroker(EventBroker):
+    """
+    Delivers events to this process only; enough for a single worker.
+    """
+
+    async def publish(self, user_id: UUID, events: Sequence[TodoEvent]) -> None:
+        self.hub.dispatch(user_id, events)
+
+
+class PostgresEventBroker(EventBroker):
+    """
+    Fans events out across workers with Postgres LISTEN / NOTIFY.
+
+    Events are NOTIFYed in the write transaction, so Postgres sends them when,
+    and only if, it commits. Each worker keeps one connection listening on
+    `channel` and dispatches what it receives, including its own notifications,
+    to its local hub; the connection is opened again whenever it drops, and
+    events sent in the meantime are lost (clients catch up with /todo/changes).
+    LISTEN needs a session-level connection, so this does not work through a
+    transaction-mode pooler such as PgBouncer.
+    """
+
+    channel = "todo_events"
+
+    def __init__(
+        self,
+        hub: TodoEventHub,
+        engine: AsyncEngine,
+        retry_seconds: float = 1.0,
+        max_retry_seconds: float = 30.0,
+    ) -> None:
+        super().__init__(hub)
+        self.engine = engine
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.listening = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        delay = self.retry_seconds
+        while True:
+            try:
+                async with self.engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection: Any = raw_connection.driver_connection
+                    closed = asyncio.Event()
+                    driver_connection.add_termination_listener(
+                        lambda _: closed.set()
+                    )
+                    await driver_connection.add_listener(self.channel, self._on_notify)
+                    self.listening.set()
+                    delay = self.retry_seconds
+                    await closed.wait()
+                    self.listening.clear()
+                    logger.warning("Lost the %s listener connection", self.channel)
+                    await connection.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.listening.clear()
+                logger.warning("Could not listen on %s: %s", self.channel, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_seconds)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            events = [TodoEvent.model_validate(event) for event in message["events"]]
+            self.hub.dispatch(UUID(message["user_id"]), events)
+        except Exception as e:
+            logger.exception(e)
+
+    async def stage(
+        self, session: AsyncSession, user_id: UUID, events: Sequence[TodoEvent]
+    ) -> None:
+        for payload in self._payloads(user_id, events):
+            await session.exec(
+                text("SELECT pg_notify(:channel, :payload)"),  # type: ignore
+                params={"channel": self.channel, "payload": payload},
+            )
+
+    async def publish(self, user_id: UUID, events: Sequence[TodoEvent]) -> None:
+        # Already sent by the commit of the transaction they were staged in
+        return None
+
+    def _payloads(self, user_id: UUID, events: Sequence[TodoEvent]) -> list[str]:
+        """
+        Packs events into as few NOTIFY payloads as the size limit allows, leaving
+        out the todo body of any event that would not fit on its own. The limit
+        is in bytes, so sizes are those of the UTF-8 encoding.
+        """
+        prefix = f'{{"user_id":"{user_id}","events":['
+        payloads: list[str] = []
+        encoded_events: list[str] = []
+        size = len(prefix) + 2
+
+        for event in events:
+            encoded = event.model_dump_json()
+            encoded_size = len(encoded.encode())
+            if len(prefix) + encoded_size + 2 > _MAX_NOTIFY_PAYLOAD:
+                encoded = event.model_dump_json(exclude={"todo"})
+                encoded_size = len(encoded)
+            if encoded_events and size + encoded_size + 1 > _MAX_NOTIFY_PAYLOAD:
+                payloads.append(prefix + ",".join(encoded_events) + "]}")
+                encoded_events, size = [], len(prefix) + 2
+            encoded_events.append(encoded)
+            size += encoded_size + 1
+
+        if encoded_events:
+            payloads.append(prefix + ",".join(encoded_events) + "]}")
+        return payloads
+
+
+def create_event_broker(name: str, hub: TodoEventHub) -> EventBroker:
+    if name == "postgres":
+        return PostgresEventBroker(hub=hub, engine=async_engine)
+    return LocalEventBroker(hub=hub)
+
+
+todo_event_hub = TodoEventHub(queue_size=settings.TODO_EVENTS_QUEUE_SIZE)
+todo_event_broker = create_event_broker(settings.TODO_EVENTS_BROKER, todo_event_hub)
@@ -1,8 +1,11 @@
-from sqlmodel import Field, Relationship
+from sqlmodel import Field, Relationship, Index, SQLModel, func
+from sqlalchemy import literal_column
+from sqlalchemy.sql.elements import ColumnElement
 from app.core.utils.generic_models import BaseUUIDModel
 
 from typing import Optional , TYPE_CHECKING
 from uuid import UUID
+from datetime import datetime
 
 from .schemas import TodoBase
 
@@ -10,5 +13,52 @@ if TYPE_CHECKING:
     from app.auth.models import User
 
 class Todo(TodoBase, BaseUUIDModel, table=True):
+    # ids are time-ordered uuid7, so (user_id, id) serves keyset pagination;
+    # (user_id, updated_at) serves the collection validator and updated sorts;
+    # (user_id, iscompleted, id) serves pages filtered on completion
+    __table_args__ = (
+        Index("ix_todo_user_id_id", "user_id", "id"),
+        Index("ix_todo_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_todo_user_id_iscompleted_id", "user_id", "iscompleted", "id"),
+    )
+
     user_id: UUID = Field(foreign_key="users.id", index=True)
     user: "User" = Relationship(back_populates="todos")
+
+
+def todo_search_vector() -> ColumnElement:
+    """
+    The full-text document of a todo. Queries must use this exact expression for
+    Postgres to match it against the GIN index below; the text search configuration
+    and the literals are rendered inline because bound parameters would not match
+    the index.
+    """
+    columns = Todo.__table__.c  # type: ignore
+    empty = literal_column("''")
+    return func.to_tsvector(
+        literal_column("'simple'::regconfig"),
+        func.coalesce(columns.title, empty)
+        .concat(literal_column("' '"))
+        .concat(func.coalesce(columns.description, empty)),
+    )
+
+
+Todo.__table__.append_constraint(  # type: ignore
+    Index("ix_todo_search", todo_search_vector(), postgresql_using="gin")
+)
+
+
+class TodoTombstone(SQLModel, table=True):
+    """
+    Records deleted todos so that clients syncing incrementally learn about them.
+    """
+
+    __tablename__ = "todo_tombstone"
+    __table_args__ = (
+        Index("ix_todo_tombstone_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    # Id of the deleted todo
+    id: UUID = Field(primary_key=True)
+    user_id: UUID
+    deleted_at: datetime
@@ -1,6 +1,9 @@
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import Optional, List
 from uuid import UUID
+from enum import Enum
+from datetime import datetime, timezone
+from pydantic import field_validator
 from app.core.utils.generic_models import BaseUUIDModel
 
 class TodoBase(SQLModel):
@@ -28,4 +31,85 @@ class TodoDelete(SQLModel):
 
 
 class TodoOut(TodoBase , BaseUUIDModel):
-    pass
\ No newline at end of file
+    pass
+
+
+class TodoSortEnum(str, Enum):
+    CREATED = "created"
+    CREATED_DESC = "-created"
+    UPDATED = "updated"
+    UPDATED_DESC = "-updated"
+
+
+class TodoFilter(SQLModel):
+    iscompleted: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    # Full-text search over title and description
+    q: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    sort: TodoSortEnum = TodoSortEnum.CREATED
+
+    @field_validator(
+        "created_after", "created_before", "updated_after", "updated_before"
+    )
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Timestamps are stored as naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class TodoPage(SQLModel):
+    items: List[TodoOut]
+    next_cursor: Optional[str] = None
+
+
+class TodoStatsBucket(SQLModel):
+    start: datetime
+    created: int
+    completed: int
+
+
+class TodoStats(SQLModel):
+    total: int
+    completed: int
+    pending: int
+    completion_ratio: float
+    bucket: str
+    histogram: List[TodoStatsBucket]
+
+
+class TodoBatchUpdate(TodoUpdate):
+    id: UUID
+
+
+class BatchStatusEnum(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+
+
+class TodoBatchItemResult(SQLModel):
+    id: UUID
+    status: BatchStatusEnum
+    todo: Optional[TodoOut] = None
+
+
+class TodoBatchResult(SQLModel):
+    items: List[TodoBatchItemResult]
+
+
+class TodoTombstoneOut(SQLModel):
+    id: UUID
+    deleted_at: datetime
+
+
+class TodoChanges(SQLModel):
+    changed: List[TodoOut]
+    deleted: List[TodoTombstoneOut]
+    next_token: str
+    has_more: bool
@@ -0,0 +1,75 @@
+"""
+Pruning of the tombstones of deleted todos, which /todo/changes only needs for
+TODO_TOMBSTONE_RETENTION_DAYS.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.utils.logger import logger_config
+
+from .models import TodoTombstone
+
+logger = logger_config(__name__)
+
+
+async def prune_tombstones(engine: AsyncEngine) -> int:
+    """
+    Deletes the tombstones older than the retention and returns how many were.
+    """
+    retained_after = datetime.utcnow() - timedelta(
+        days=settings.TODO_TOMBSTONE_RETENTION_DAYS
+    )
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            delete(TodoTombstone).where(
+                TodoTombstone.deleted_at < retained_after  # type: ignore
+            )
+        )
+    return result.rowcount
+
+
+class TombstonePruner:
+    """
+    Prunes the tombstones every `interval` seconds. Every worker runs one, which
+    is harmless as the deletes are idempotent.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float) -> None:
+        self.engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                pruned = await prune_tombstones(self.engine)
+                if pruned:
+                    logger.info("Pruned %s todo tombstones", pruned)
+            except Exception as e:
+                logger.warning("Could not prune todo tombstones: %s", e)
+
+
+tombstone_pruner = TombstonePruner(
+    async_engine, interval=settings.TODO_TOMBSTONE_PRUNE_INTERVAL_SECONDS
+)
@@ -1,27 +1,82 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import (
+    Body,
+    Depends,
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.utils.deps import SessionDep, CurrentUserDep
 from app.core.utils.logger import logger
 from app.core.utils.generic_models import Message
+from app.core.utils.fast_json import FastJSONRoute
+from app.core.utils.http_cache import (
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    set_validators,
+)
+from app.core.utils.pagination import (
+    SyncPosition,
+    decode_cursor,
+    decode_position_cursor,
+    decode_sync_token,
+)
 
 from .models import Todo
-from .schemas import TodoOut, TodoRead, TodoUpdate, TodoCreate, TodoDelete
-from .crud import TodoCrudDep
+from .schemas import (
+    TodoOut,
+    TodoPage,
+    TodoFilter,
+    TodoSortEnum,
+    TodoRead,
+    TodoUpdate,
+    TodoCreate,
+    TodoDelete,
+    TodoBatchUpdate,
+    TodoBatchResult,
+    TodoChanges,
+    TodoStats,
+)
+from .crud import TodoCrudDep, TodoReadCrudDep
+from .events import todo_event_hub
 
-from typing import Annotated
+import asyncio
+from datetime import datetime, timezone
+from collections.abc import AsyncGenerator
+from typing import Annotated, List, Literal, Optional, Union
 from uuid import UUID
 
-TodoRouter = APIRouter()
+# Todo routes take the large (batch) payloads, so their bodies are decoded with
+# the fast JSON backend
+TodoRouter = APIRouter(route_class=FastJSONRoute)
 
 
 ######## GET METHOD ########
-@TodoRouter.get("/", response_model=list[TodoOut])
+@TodoRouter.get("/", response_model=TodoPage)
 async def get_all_todos_route(
+    request: Request,
     current_user: CurrentUserDep,
-    TodoCrud: TodoCrudDep,
+    TodoCrud: TodoReadCrudDep,
+    filters: Annotated[TodoFilter, Depends()],
+    limit: Annotated[
+        int, Query(ge=1, le=settings.TODO_PAGE_MAX_LIMIT)
+    ] = settings.TODO_PAGE_DEFAULT_LIMIT,
+    after: Optional[str] = None,
 ):
+    """
+    Returns a page of the current user's todos, optionally filtered on completion,
+    creation / update date ranges and a full-text search `q` over title and
+    description, in the given `sort` order. Pass `next_cursor` as `after`, with the
+    same filters and sort, to get the next page.
+    """
     try:
         if not isinstance(current_user.id, UUID):
             raise HTTPException(
@@ -29,10 +84,43 @@ async def get_all_todos_route(
                 detail="Could not validate credentials",
             )
 
-        result = await TodoCrud.get_all_todos(user_id=current_user.id)
-        todos = [TodoOut(**todo.model_dump()) for todo in result]
+        try:
+            after_position: Optional[Union[UUID, SyncPosition]] = None
+            if after is not None and filters.sort in (
+                TodoSortEnum.UPDATED,
+                TodoSortEnum.UPDATED_DESC,
+            ):
+                after_position = decode_position_cursor(after)
+            elif after is not None:
+                after_position = decode_cursor(after)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Cursor"
+            )
+
+        # Answer polling clients from the collection validator alone; any change
+        # to the collection changes it, whatever the filters
+        count, last_updated = await TodoCrud.get_todos_validator(
+            user_id=current_user.id
+        )
+        etag = make_etag(
+            count, last_updated, limit, after, filters.model_dump_json()
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, last_updated)
 
-        return todos
+        # The page comes back pre-encoded; returning it as a Response skips
+        # response_model validation and serialisation
+        page = await TodoCrud.get_all_todos(
+            user_id=current_user.id,
+            limit=limit,
+            after=after_position,
+            filters=filters,
+            validator=etag,
+        )
+        response = Response(content=page, media_type="application/json")
+        set_validators(response, etag, last_updated)
+        return response
 
     except HTTPException as e:
         logger.info(str(e))
@@ -46,12 +134,341 @@ async def get_all_todos_route(
         )
 
 
+######## GET METHOD ########
+@TodoRouter.get("/changes", response_model=TodoChanges)
+async def get_todo_changes_route(
+    current_user: CurrentUserDep,
+    TodoCrud: TodoReadCrudDep,
+    since: Optional[str] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.TODO_SYNC_MAX_CHANGES)
+    ] = settings.TODO_SYNC_MAX_CHANGES,
+):
+    """
+    Returns the todos created or updated and the ids of the todos deleted since
+    the `since` token of a previous call (everything when omitted). Keep calling
+    with `next_token` while `has_more` is true. A token older than the tombstone
+    retention gets 410 Gone: sync again without `since`.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+
+        try:
+            changed, deleted, synced_at = (
+                decode_sync_token(since) if since is not None else (None, None, None)
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Sync Token"
+            )
+
+        return await TodoCrud.get_changes(
+            user_id=current_user.id,
+            since=(changed, deleted),
+            synced_at=synced_at,
+            limit=limit,
+        )
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Getting Todo Changes",
+        )
+
+
+######## GET METHOD ########
+@TodoRouter.get("/stats", response_model=TodoStats)
+async def get_todo_stats_route(
+    current_user: CurrentUserDep,
+    TodoCrud: TodoReadCrudDep,
+    bucket: Literal["day", "week", "month"] = "day",
+    since: Optional[datetime] = None,
+):
+    """
+    Returns the current user's todo counts, completion ratio and a histogram of
+    created and completed todos per `bucket`, optionally limited to the todos
+    created since `since`.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+
+        if since is not None and since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+        return await TodoCrud.get_stats(
+            user_id=current_user.id, bucket=bucket, since=since
+        )
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Getting Todo Stats",
+        )
+
+
+async def _encode_events(user_id: UUID) -> AsyncGenerator[bytes, None]:
+    """
+    Yields the user's todo events as Server-Sent Events, with a keep-alive comment
+    whenever nothing happened for `TODO_EVENTS_HEARTBEAT_SECONDS`. The stream is
+    cancelled, and the subscription dropped, when the client disconnects.
+    """
+    queue = todo_event_hub.subscribe(user_id)
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.TODO_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield f"event: {event.type.value}\ndata: {event.model_dump_json()}\n\n".encode()
+    finally:
+        todo_event_hub.unsubscribe(user_id, queue)
+
+
+######## GET METHOD ########
+@TodoRouter.get("/events", response_class=StreamingResponse)
+async def todo_events_route(current_user: CurrentUserDep):
+    """
+    Pushes the current user's todo create / update / delete events as Server-Sent Events.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+
+        return StreamingResponse(
+            _encode_events(current_user.id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Streaming Todo Events",
+        )
+
+
+async def _encode_export(
+    todos: AsyncGenerator[bytes, None], export_format: str
+) -> AsyncGenerator[bytes, None]:
+    """
+    Frames streamed todo JSON as NDJSON lines or as the elements of a JSON array,
+    flushing every `TODO_EXPORT_CHUNK_SIZE` todos.
+    """
+    separator = b"\n" if export_format == "ndjson" else b","
+    chunk: list[bytes] = []
+    first = True
+
+    if export_format == "json":
+        yield b"["
+    try:
+        async for encoded in todos:
+            if export_format == "ndjson":
+                chunk.append(encoded + separator)
+            else:
+                chunk.append(encoded if first else separator + encoded)
+            first = False
+
+            if len(chunk) >= settings.TODO_EXPORT_CHUNK_SIZE:
+                yield b"".join(chunk)
+                chunk.clear()
+
+        if chunk:
+            yield b"".join(chunk)
+
+    except Exception as e:
+        # The status line is already sent, so the stream can only be cut short
+        logger.info(str(e))
+        raise
+
+    if export_format == "json":
+        yield b"]"
+
+
+######## GET METHOD ########
+@TodoRouter.get("/export", response_class=StreamingResponse)
+async def export_todos_route(
+    current_user: CurrentUserDep,
+    TodoCrud: TodoReadCrudDep,
+    export_format: Annotated[
+        Literal["ndjson", "json"], Query(alias="format")
+    ] = "ndjson",
+):
+    """
+    Streams every todo of the current user as NDJSON (default) or as a chunked JSON array.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+
+        media_type = (
+            "application/x-ndjson" if export_format == "ndjson" else "application/json"
+        )
+        return StreamingResponse(
+            _encode_export(
+                TodoCrud.stream_todos(user_id=current_user.id), export_format
+            ),
+            media_type=media_type,
+        )
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Exporting Todos",
+        )
+
+
+def _check_batch_size(size: int) -> None:
+    if size > settings.TODO_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds the limit of {settings.TODO_BATCH_MAX_SIZE}",
+        )
+
+
+####### BATCH POST METHOD ########
+@TodoRouter.post("/batch", response_model=TodoBatchResult)
+async def add_todos_route(
+    new_todos: List[TodoCreate],
+    current_user: CurrentUserDep,
+    TodoCrud: TodoCrudDep,
+):
+    """
+    Creates several todos in one transaction.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+        _check_batch_size(len(new_todos))
+
+        return await TodoCrud.add_todos(new_todos=new_todos, user_id=current_user.id)
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Adding Todos",
+        )
+
+
+# ######## BATCH UPDATE METHOD ########
+@TodoRouter.patch("/batch", response_model=TodoBatchResult)
+async def update_todos_route(
+    updated_todos: List[TodoBatchUpdate],
+    current_user: CurrentUserDep,
+    TodoCrud: TodoCrudDep,
+):
+    """
+    Updates several todos in one transaction. Unknown ids are reported as `not_found`.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+        _check_batch_size(len(updated_todos))
+
+        return await TodoCrud.update_todos(
+            updated_todos=updated_todos, user_id=current_user.id
+        )
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Updating Todos",
+        )
+
+
+# ######## BATCH DELETE METHOD ########
+@TodoRouter.delete("/batch", response_model=TodoBatchResult)
+async def delete_todos_route(
+    todo_ids: Annotated[List[UUID], Body()],
+    current_user: CurrentUserDep,
+    TodoCrud: TodoCrudDep,
+):
+    """
+    Deletes several todos in one transaction. Unknown ids are reported as `not_found`.
+    """
+    try:
+        if not isinstance(current_user.id, UUID):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+        _check_batch_size(len(todo_ids))
+
+        return await TodoCrud.delete_todos(todo_ids=todo_ids, user_id=current_user.id)
+
+    except HTTPException as e:
+        logger.info(str(e))
+        raise e
+
+    except Exception as e:
+        logger.info(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error Deleting Todos",
+        )
+
+
 ######## GET METHOD ########
 @TodoRouter.get("/{todo_id}", response_model=TodoOut)
 async def get_todo_route(
     todo_id: UUID,
+    request: Request,
+    response: Response,
     current_user: CurrentUserDep,
-    TodoCrud: TodoCrudDep,
+    TodoCrud: TodoReadCrudDep,
 ):
     try:
         if not isinstance(current_user.id, UUID):
@@ -65,7 +482,13 @@ async def get_todo_route(
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
             )
-        return TodoOut(**result.model_dump())
+
+        etag = make_etag(result.id, result.updated_at)
+        if is_not_modified(request, etag, result.updated_at):
+            return not_modified_response(etag, result.updated_at)
+
+        set_validators(response, etag, result.updated_at)
+        return result
 
     except HTTPException as e:
         logger.info(str(e))
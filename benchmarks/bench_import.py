@@ -0,0 +1,84 @@
+"""
+Cold start cost: the time a fresh interpreter takes to import the application.
+
+    poetry run python -m benchmarks.bench_import --budget-ms 1500
+
+Every run imports `--module` in a new process with `-X importtime` and records
+the cumulative import time of the module. The median is compared with
+`--budget-ms`, and the script exits with 1 when it is over budget, so that it
+can gate CI. `--top` lists the costliest packages by cumulative time.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+from benchmarks.common import print_results, save_results
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Returns the cumulative import time, in microseconds, of every module that a
+    fresh interpreter imports along with `module`.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, help="Fail above this median")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="Results file of a run to compare with")
+    args = parser.parse_args()
+
+    # The first run compiles the bytecode, which cold starts do not pay
+    import_times(args.module)
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(run[args.module] for run in runs) / 1000
+
+    packages: dict[str, list[int]] = {}
+    for run in runs:
+        for name, cumulative in run.items():
+            if "." not in name or name.startswith("app."):
+                packages.setdefault(name, []).append(cumulative)
+
+    results: dict[str, dict[str, Any]] = {
+        args.module: {"import_ms": round(median_ms, 1)}
+    }
+    for name, values in sorted(
+        packages.items(), key=lambda item: -statistics.median(item[1])
+    )[: args.top]:
+        if name != args.module:
+            results[name] = {"import_ms": round(statistics.median(values) / 1000, 1)}
+
+    path = save_results(
+        "import", {"module": args.module, "runs": args.runs}, results, args.output
+    )
+    print_results(results, ["import_ms"], args.baseline)
+    print(f"\nSaved to {path}")
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"{args.module} imports in {median_ms:.0f} ms, over {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Load test of the API hot paths against a seeded database.
+
+    poetry run python -m benchmarks.bench_load \
+        --database-url postgresql://postgres@localhost/benchmark --users 5
+
+By default the real ASGI `app` is driven in process through `httpx.ASGITransport`
+(lifespan included), against the database of `--database-url`, which is never
+taken from the environment; pass `--base-url http://127.0.0.1:8000` to load a
+running server instead, e.g. one started with `python -m app.serve`, along with
+the `--database-url` it uses. Databases and servers on other hosts than this one
+are refused unless `--allow-remote` is passed.
+
+Seeding signs up `--users` fresh users and creates `--todos-per-user` todos for
+each through the batch endpoint. Every operation (login, list, get, create, patch,
+delete) then runs `--requests` times with `--concurrency` requests in flight, and
+req/s with p50 / p95 / p99 latencies are reported and saved as JSON. The seeded
+users and their todos are deleted at the end, even when a run fails.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import random
+import string
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from benchmarks.common import print_results, save_results, summarize
+
+API_STR = "/api/v1"
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 500
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def random_name() -> str:
+    return "".join(random.choices(string.ascii_lowercase, k=16))
+
+
+def is_local_database(url: str) -> bool:
+    parsed = make_url(url)
+    host: Any = parsed.host or parsed.query.get("host")
+    if isinstance(host, tuple):
+        host = host[0]
+    # No host, or a directory, is a unix socket
+    return not host or host.startswith("/") or host in LOCAL_HOSTS
+
+
+def is_local_server(base_url: str) -> bool:
+    return urlsplit(base_url).hostname in LOCAL_HOSTS
+
+
+@contextlib.asynccontextmanager
+async def open_client(base_url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    if base_url:
+        async with httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + API_STR, timeout=60
+        ) as client:
+            yield client
+        return
+
+    # Imported here, once main() has pointed the settings at --database-url
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark" + API_STR, timeout=60
+        ) as client:
+            yield client
+
+
+class Seed:
+    def __init__(self) -> None:
+        self.emails: list[str] = []
+        self.headers: list[dict[str, str]] = []
+        self.todo_ids: list[list[str]] = []
+
+
+async def seed(
+    client: httpx.AsyncClient, data: Seed, users: int, todos_per_user: int
+) -> None:
+    """
+    Fills `data` as it goes, so that whatever was seeded before a failure is
+    cleaned up.
+    """
+    for _ in range(users):
+        email = f"{random_name()}@benchmark.com"
+        response = await client.post(
+            "/auth/sign-up",
+            json={"email": email, "username": random_name(), "password": PASSWORD},
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        todo_ids: list[str] = []
+        data.emails.append(email)
+        data.headers.append(headers)
+        data.todo_ids.append(todo_ids)
+        for start in range(0, todos_per_user, BATCH_SIZE):
+            response = await client.post(
+                "/todo/batch",
+                json=[
+                    {"title": f"Benchmark {i}", "description": "Seeded by bench_load"}
+                    for i in range(start, min(start + BATCH_SIZE, todos_per_user))
+                ],
+                headers=headers,
+            )
+            response.raise_for_status()
+            todo_ids.extend(item["id"] for item in response.json()["items"])
+
+
+async def cleanup(client: httpx.AsyncClient, data: Seed) -> None:
+    """
+    Deletes every todo of the seeded users, including those the run created, then
+    the users themselves.
+    """
+    for email, headers in zip(data.emails, data.headers):
+        try:
+            todo_ids: list[str] = []
+            params: dict[str, Any] = {"limit": BATCH_SIZE}
+            while True:
+                response = await client.get("/todo/", params=params, headers=headers)
+                response.raise_for_status()
+                page = response.json()
+                todo_ids.extend(todo["id"] for todo in page["items"])
+                if page["next_cursor"] is None:
+                    break
+                params["after"] = page["next_cursor"]
+
+            for start in range(0, len(todo_ids), BATCH_SIZE):
+                response = await client.request(
+                    "DELETE",
+                    "/todo/batch",
+                    json=todo_ids[start : start + BATCH_SIZE],
+                    headers=headers,
+                )
+                response.raise_for_status()
+            response = await client.delete("/auth/delete-account", headers=headers)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"Could not delete the benchmark user {email}: {e}")
+
+
+async def run_operation(
+    request: Callable[[int], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """
+    Calls `request(i)` for i in range(`requests`) from `concurrency` workers.
+    """
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while (index := next(counter)) < requests:
+            start = time.perf_counter()
+            response = await request(index)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient, data: Seed, args: argparse.Namespace
+) -> dict[str, dict[str, Any]]:
+    await seed(client, data, args.users, args.todos_per_user)
+    users = len(data.headers)
+    created: list[tuple[int, str]] = []
+
+    def user_of(index: int) -> int:
+        return index % users
+
+    async def login(index: int) -> httpx.Response:
+        return await client.post(
+            "/auth/login",
+            data={"username": data.emails[user_of(index)], "password": PASSWORD},
+        )
+
+    async def list_todos(index: int) -> httpx.Response:
+        return await client.get(
+            "/todo/",
+            params={"limit": args.page_size},
+            headers=data.headers[user_of(index)],
+        )
+
+    async def get_todo(index: int) -> httpx.Response:
+        user = user_of(index)
+        todo_id = random.choice(data.todo_ids[user])
+        return await client.get(f"/todo/{todo_id}", headers=data.headers[user])
+
+    async def create_todo(index: int) -> httpx.Response:
+        user = user_of(index)
+        response = await client.post(
+            "/todo/",
+            json={"title": f"Created {index}", "description": "bench_load"},
+            headers=data.headers[user],
+        )
+        if response.status_code == 200:
+            created.append((user, response.json()["id"]))
+        return response
+
+    async def patch_todo(index: int) -> httpx.Response:
+        user = user_of(index)
+        todo_id = random.choice(data.todo_ids[user])
+        return await client.patch(
+            f"/todo/{todo_id}",
+            json={"iscompleted": index % 2 == 0},
+            headers=data.headers[user],
+        )
+
+    async def delete_todo(index: int) -> httpx.Response:
+        user, todo_id = created[index % len(created)]
+        return await client.delete(f"/todo/{todo_id}", headers=data.headers[user])
+
+    operations = {
+        "login": login,
+        "list": list_todos,
+        "get": get_todo,
+        "create": create_todo,
+        "patch": patch_todo,
+        "delete": delete_todo,
+    }
+    results: dict[str, dict[str, Any]] = {}
+    for name in args.operations:
+        # Deletes consume the todos made by "create", one each
+        requests = (
+            min(args.requests, len(created)) if name == "delete" else args.requests
+        )
+        if requests == 0:
+            continue
+        results[name] = await run_operation(
+            operations[name], requests, args.concurrency
+        )
+    return results
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not args.allow_remote:
+        if not is_local_database(args.database_url):
+            raise SystemExit(
+                "Refusing to seed a database on another host; pass --allow-remote"
+            )
+        if args.base_url and not is_local_server(args.base_url):
+            raise SystemExit("Refusing to load another host; pass --allow-remote")
+    os.environ["POSTGRES_DATABASE_URL"] = args.database_url
+
+    data = Seed()
+    async with open_client(args.base_url) as client:
+        try:
+            results = await run_benchmark(client, data, args)
+        finally:
+            await cleanup(client, data)
+
+    params = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("output", "baseline", "database_url")
+    }
+    path = save_results("load", params, results, args.output)
+    print_results(
+        results, ["req_per_s", "p50_ms", "p95_ms", "p99_ms", "errors"], args.baseline
+    )
+    print(f"\nSaved to {path}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--database-url",
+        required=True,
+        help="Database to seed, the one of the server with --base-url",
+    )
+    parser.add_argument("--base-url", help="Load a running server instead of the ASGI app")
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Allow a database or server on another host",
+    )
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--todos-per-user", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="Per operation")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        default=["login", "list", "get", "create", "patch", "delete"],
+        choices=["login", "list", "get", "create", "patch", "delete"],
+    )
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="Results file of a run to compare with")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,77 @@
+"""
+Micro-benchmarks of the per-request building blocks.
+
+    poetry run python -m benchmarks.bench_micro --number 20000
+
+- uuid7: a primary key for every created row.
+- create_access_token / jwt_decode: every login, and every authenticated request.
+- todo_out: validating one row into `TodoOut` and dumping it to JSON, and
+  todo_json: the pre-encoded path used by the todo endpoints.
+
+Each benchmark reports the best mean time per call over `--repeat` runs of
+`--number` calls, saved as JSON like bench_load.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+import app.main  # noqa: F401 (configures the mappers)
+from app.core.security import create_access_token, decode_access_token
+from app.core.utils.uuid6 import uuid7
+from app.todo.crud import todo_json
+from app.todo.models import Todo
+from app.todo.schemas import TodoOut
+from benchmarks.common import print_results, save_results
+
+
+def benchmarks() -> dict[str, Callable[[], Any]]:
+    user_id = uuid4()
+    token = create_access_token({"sub": user_id})
+    todo = Todo(
+        title="Benchmark Title",
+        description="Benchmark Description " * 4,
+        iscompleted=True,
+        user_id=user_id,
+    )
+    return {
+        "uuid7": uuid7,
+        "create_access_token": lambda: create_access_token({"sub": user_id}),
+        "jwt_decode": lambda: decode_access_token(token),
+        "todo_out": lambda: TodoOut.model_validate(
+            todo, from_attributes=True
+        ).model_dump_json(),
+        "todo_json": lambda: todo_json(todo),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="Calls per run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Names of the benchmarks to run")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="Results file of a run to compare with")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    for name, func in benchmarks().items():
+        if args.only and name not in args.only:
+            continue
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        per_call = best / args.number
+        results[name] = {
+            "us_per_call": round(per_call * 1e6, 3),
+            "calls_per_s": round(1 / per_call),
+        }
+
+    params = {"number": args.number, "repeat": args.repeat}
+    path = save_results("micro", params, results, args.output)
+    print_results(results, ["us_per_call", "calls_per_s"], args.baseline)
+    print(f"\nSaved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Ids per second of uuid7 generation, before and after the buffered generator.
+
+    poetry run python -m benchmarks.bench_uuid7 --number 200000
+
+- previous: the former `uuid7()`, with `secrets.randbits` per id and the
+  validating `UUID(int=..., version=7)` constructor.
+- uuid7: the current generator, one id per call.
+- uuid7_batch: ids made `--batch` at a time, as for bulk inserts.
+- uuid7 xN threads: `--threads` threads sharing the generator.
+"""
+
+import argparse
+import secrets
+import threading
+import time
+from collections.abc import Callable
+
+from app.core.utils.uuid6 import UUID, _subsec_encode, uuid7, uuid7_batch
+
+_last_timestamp = None
+
+
+def previous_uuid7() -> UUID:
+    global _last_timestamp
+
+    nanoseconds = time.time_ns()
+    if _last_timestamp is not None and nanoseconds <= _last_timestamp:
+        nanoseconds = _last_timestamp + 1
+    _last_timestamp = nanoseconds
+    timestamp_ms, timestamp_ns = divmod(nanoseconds, 10**6)
+    subsec = _subsec_encode(timestamp_ns)
+    uuid_int = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+    uuid_int |= (subsec >> 8) << 64
+    uuid_int |= (subsec & 0xFF) << 54
+    uuid_int |= secrets.randbits(54)
+    return UUID(int=uuid_int, version=7)
+
+
+def ids_per_second(generate: Callable[[], object], number: int, calls: int) -> float:
+    """
+    `generate` makes `number / calls` ids per call.
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        generate()
+    return number / (time.perf_counter() - start)
+
+
+def threaded_ids_per_second(number: int, threads: int) -> float:
+    per_thread = number // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def run() -> None:
+        barrier.wait()
+        for _ in range(per_thread):
+            uuid7()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    number, batch = args.number, args.batch
+    runs = {
+        "previous": lambda: ids_per_second(previous_uuid7, number, number),
+        "uuid7": lambda: ids_per_second(uuid7, number, number),
+        "uuid7_batch": lambda: ids_per_second(
+            lambda: uuid7_batch(batch), number // batch * batch, number // batch
+        ),
+        f"uuid7 x{args.threads} threads": lambda: threaded_ids_per_second(
+            number, args.threads
+        ),
+    }
+    baseline = None
+    for name, run in runs.items():
+        best = max(run() for _ in range(args.repeat))
+        baseline = baseline or best
+        print(f"{name:<20} {best:>12,.0f} ids/s ({best / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Helpers shared by the benchmark scripts: latency summaries and JSON results that
+can be compared from run to run.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict[str, Any]:
+    """
+    Summarises the latencies (in seconds) of requests that took `elapsed` seconds
+    of wall time in total.
+    """
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "req_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(
+    suite: str,
+    params: dict[str, Any],
+    results: dict[str, dict[str, Any]],
+    output: Optional[str] = None,
+) -> Path:
+    """
+    Writes the results with enough context (commit, interpreter, parameters) to
+    compare them with another run, by default under benchmarks/results/.
+    """
+    timestamp = datetime.now(timezone.utc)
+    path = (
+        Path(output)
+        if output
+        else RESULTS_DIR / f"{suite}-{timestamp.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "suite": suite,
+        "timestamp": timestamp.isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
+
+def print_results(
+    results: dict[str, dict[str, Any]],
+    metrics: list[str],
+    baseline: Optional[str] = None,
+) -> None:
+    """
+    Prints one row per benchmark, with the relative change of each metric against
+    the results file `baseline` when given.
+    """
+    previous: dict[str, dict[str, Any]] = {}
+    if baseline:
+        previous = json.loads(Path(baseline).read_text())["results"]
+
+    print(f"{'benchmark':<24}" + "".join(f"{metric:>22}" for metric in metrics))
+    for name, values in results.items():
+        row = f"{name:<24}"
+        for metric in metrics:
+            cell = f"{values[metric]}"
+            before = previous.get(name, {}).get(metric)
+            if before:
+                cell += f" ({(values[metric] - before) / before:+.1%})"
+            row += f"{cell:>22}"
+        print(row)
@@ -14,6 +14,7 @@ from app.main import app
 
 from tests.utils.auth import get_user_token_headers, get_admin_token_headers
 from app.core.db import init_db
+from app.core.utils.instrumentation import instrument_engine
 
 from sqlalchemy.pool import NullPool
 
@@ -37,6 +38,7 @@ test_async_connection_string = (
 test_async_engine = create_async_engine(
     url=test_async_connection_string, poolclass=NullPool
 )
+instrument_engine(test_async_engine, name="test")
 
 
 async def get_test_async_session() -> AsyncGenerator[AsyncSession, None]:
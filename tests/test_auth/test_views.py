@@ -108,3 +108,25 @@ class TestLogin:
         assert response.status_code == expected_status
         if expected_response is not None:
             assert response.json() == expected_response
+
+
+class TestProfile:
+    async def test_update_profile(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.get("/auth/profile", headers=user_token_headers)
+        assert response.status_code == 200
+
+        full_name = create_random_lower_string()
+        response = await test_client.patch(
+            "/auth/profile",
+            json={"full_name": full_name},
+            headers=user_token_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["full_name"] == full_name
+
+        # The cached user must not outlive the update
+        response = await test_client.get("/auth/profile", headers=user_token_headers)
+        assert response.status_code == 200
+        assert response.json()["full_name"] == full_name
@@ -0,0 +1,20 @@
+import pytest
+
+from app.core.utils.cache import MemoryCacheBackend, ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_response_cache_set_after_invalidate():
+    cache = ResponseCache(MemoryCacheBackend(maxsize=100, ttl=60), "test", ttl=60)
+
+    value, version = await cache.get("user", "list")
+    assert value is None
+    # A write lands between the read of the data and its caching
+    await cache.invalidate("user")
+    await cache.set("user", "list", b"before the write", version)
+    value, version = await cache.get("user", "list")
+    assert value is None
+
+    await cache.set("user", "list", b"after the write", version)
+    value, _ = await cache.get("user", "list")
+    assert value == b"after the write"
@@ -0,0 +1,71 @@
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.core.config import parse_url_list
+from app.core.db import ReplicaRouter
+
+
+def fake_engine(checkedout: int = 0) -> SimpleNamespace:
+    return SimpleNamespace(pool=SimpleNamespace(checkedout=lambda: checkedout))
+
+
+def make_router(engines: list, selection: str = "round_robin", **kwargs) -> ReplicaRouter:
+    return ReplicaRouter(
+        engines=engines,  # type: ignore
+        selection=selection,
+        sticky_seconds=kwargs.pop("sticky_seconds", 5.0),
+        **kwargs,
+    )
+
+
+def test_round_robin():
+    router = make_router([fake_engine(), fake_engine(), fake_engine()])
+    picked = [router.session_maker_for(uuid4()) for _ in range(6)]
+    assert picked == router.session_makers * 2
+
+
+def test_least_connections():
+    router = make_router(
+        [fake_engine(3), fake_engine(1), fake_engine(2)], selection="least_connections"
+    )
+    assert router.session_maker_for(uuid4()) is router.session_makers[1]
+
+
+def test_no_replicas_reads_from_primary():
+    router = make_router([])
+    user_id = uuid4()
+    router.mark_write(user_id)
+    assert router.session_maker_for(user_id) is None
+
+
+def test_read_your_writes_window():
+    router = make_router([fake_engine()], sticky_seconds=0.05)
+    writer, reader = uuid4(), uuid4()
+    router.mark_write(writer)
+
+    assert router.session_maker_for(writer) is None
+    assert router.session_maker_for(reader) is router.session_makers[0]
+
+    time.sleep(0.06)
+    assert router.session_maker_for(writer) is router.session_makers[0]
+
+
+def test_read_your_writes_maxsize():
+    router = make_router([fake_engine()], sticky_maxsize=1)
+    first, second = uuid4(), uuid4()
+    router.mark_write(first)
+    router.mark_write(second)
+
+    assert router.session_maker_for(first) is router.session_makers[0]
+    assert router.session_maker_for(second) is None
+
+
+def test_parse_url_list():
+    multi_host = "postgresql://user@host1:5432,host2:5432/db"
+    assert parse_url_list(f" {multi_host}\n postgresql://user@host3/db ") == [
+        multi_host,
+        "postgresql://user@host3/db",
+    ]
+    assert parse_url_list(f'["{multi_host}"]') == [multi_host]
+    assert parse_url_list("") == []
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel
+
+from app.core import migrations
+from app.core.migrations.operations import create_index_concurrently, execute
+from tests.conftest import test_async_engine
+
+
+async def index_names(table: str) -> set[str]:
+    async with test_async_engine.connect() as conn:
+        indexes = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_indexes(table)
+        )
+    return {index["name"] for index in indexes}
+
+
+@pytest.mark.asyncio
+async def test_schema_matches_models():
+    head = migrations.head_version()
+    assert await migrations.check_schema(test_async_engine) == head
+    # Every table and index declared on the models is created by the migrations
+    for table in SQLModel.metadata.sorted_tables:
+        assert {index.name for index in table.indexes} <= await index_names(
+            table.name
+        )
+
+    assert await migrations.upgrade(test_async_engine) == []
+
+
+@pytest.mark.asyncio
+async def test_downgrade_upgrade():
+    head = migrations.head_version()
+    assert await migrations.downgrade(test_async_engine) == [head]
+    assert "ix_todo_search" not in await index_names("todo")
+    with pytest.raises(RuntimeError):
+        await migrations.check_schema(test_async_engine)
+
+    assert await migrations.upgrade(test_async_engine) == [head]
+    assert "ix_todo_search" in await index_names("todo")
+    assert await migrations.check_schema(test_async_engine) == head
+
+
+@pytest.mark.asyncio
+async def test_create_index_concurrently_rebuilds_invalid_index():
+    is_valid = text(
+        "SELECT indisvalid FROM pg_index "
+        "WHERE indexrelid = 'ix_migration_scratch'::regclass"
+    )
+    async with test_async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await execute(
+            conn,
+            "DROP TABLE IF EXISTS migration_scratch",
+            "CREATE TABLE migration_scratch (value INTEGER)",
+            "INSERT INTO migration_scratch VALUES (1), (1)",
+        )
+        try:
+            # A concurrent build that fails, here on the duplicates, leaves an
+            # invalid index behind, as an interrupted one does
+            with pytest.raises(IntegrityError):
+                await execute(
+                    conn,
+                    "CREATE UNIQUE INDEX CONCURRENTLY ix_migration_scratch "
+                    "ON migration_scratch (value)",
+                )
+            assert await conn.scalar(is_valid) is False
+
+            await create_index_concurrently(
+                conn, "ix_migration_scratch", "migration_scratch (value)"
+            )
+            assert await conn.scalar(is_valid) is True
+        finally:
+            await execute(conn, "DROP TABLE IF EXISTS migration_scratch")
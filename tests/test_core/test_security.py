@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import PasswordHasherPool
+
+
+async def test_hasher_pool_rejects_when_full():
+    pool = PasswordHasherPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        # One call running and one queued fill the pool
+        blocked = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.in_flight == 2
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(release.wait)
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers == {"Retry-After": "1"}
+
+        release.set()
+        assert await asyncio.gather(*blocked) == [True, True]
+        assert (pool.in_flight, pool.completed, pool.rejected) == (0, 2, 1)
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+async def test_hasher_pool_counts_failures():
+    pool = PasswordHasherPool(max_workers=1, max_queue=0)
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(int, "not a number")
+        assert (pool.completed, pool.failed) == (0, 1)
+    finally:
+        pool.shutdown()
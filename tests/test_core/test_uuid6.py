@@ -0,0 +1,45 @@
+import threading
+
+from app.core.utils.uuid6 import UUID, uuid7, uuid7_batch
+
+
+def test_uuid7_fields() -> None:
+    value = uuid7()
+    assert isinstance(value, UUID)
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert UUID(str(value)) == value
+    assert hash(value) == hash(UUID(int=value.int))
+
+
+def test_uuid7_batch() -> None:
+    assert uuid7_batch(0) == []
+    before = uuid7()
+    batch = uuid7_batch(10000)
+    after = uuid7()
+    assert len(set(batch)) == 10000
+    assert all(value.version == 7 for value in batch)
+    assert [before] + batch + [after] == sorted([before] + batch + [after])
+
+
+def test_uuid7_monotonic_across_threads() -> None:
+    results: list[list[UUID]] = []
+    barrier = threading.Barrier(8)
+
+    def generate() -> None:
+        barrier.wait()
+        ids = [uuid7() for _ in range(5000)] + uuid7_batch(500)
+        results.append(ids)
+
+    threads = [threading.Thread(target=generate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_ids = [value for ids in results for value in ids]
+    assert len(set(all_ids)) == len(all_ids) == 8 * 5500
+    # Ids of every thread increase, and no two threads got the same timestamp
+    for ids in results:
+        assert ids == sorted(ids)
+    assert len({value.int >> 54 for value in all_ids}) == len(all_ids)
@@ -1,8 +1,100 @@
+import asyncio
+import time
+
 import pytest
 from httpx import AsyncClient
+from app.core.config import settings
+from app.core.utils.profiling import LoopWatchdog
 from app.health.models import Status
 
 
+@pytest.mark.asyncio
+async def test_compressed_openapi(test_client: AsyncClient):
+    for _ in range(2):
+        response = await test_client.get(
+            "/openapi.json", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json()["info"]["title"]
+
+    # Small responses are sent as is
+    response = await test_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_metrics(test_client: AsyncClient):
+    await test_client.get("/")
+    response = await test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert "# TYPE http_requests_total counter" in body
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/",tag="Health",status="200"}'
+        in body
+    )
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert "password_hash_in_flight" in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_protected(test_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_IPS", ["10.0.0.0/8"])
+    response = await test_client.get("/metrics")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-token")
+    response = await test_client.get(
+        "/metrics", headers={"Authorization": "Bearer wrong-token"}
+    )
+    assert response.status_code == 401
+    response = await test_client.get(
+        "/metrics", headers={"Authorization": "Bearer metrics-token"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_profile(
+    test_client: AsyncClient, admin_token_headers, user_token_headers, monkeypatch
+):
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+
+    response = await test_client.get(
+        "/debug/profile", params={"seconds": 0.1}, headers=user_token_headers
+    )
+    assert response.status_code == 400
+
+    response = await test_client.get(
+        "/debug/profile",
+        params={"seconds": 0.1, "threads": "all"},
+        headers=admin_token_headers,
+    )
+    assert response.status_code == 200
+    stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) > 0
+
+
+@pytest.mark.asyncio
+async def test_loop_watchdog():
+    watchdog = LoopWatchdog(threshold=0.05)
+    await watchdog.start()
+    try:
+        time.sleep(0.3)
+        await asyncio.sleep(0.1)
+    finally:
+        await watchdog.stop()
+
+    assert watchdog.blocks == 1
+    assert "test_loop_watchdog" in (watchdog.last_report or "")
+
+
 @pytest.mark.asyncio
 async def test_root(test_client: AsyncClient):
     response = await test_client.get("/")
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import async_engine
+from app.todo.events import (
+    PostgresEventBroker,
+    TodoEvent,
+    TodoEventHub,
+    TodoEventTypeEnum,
+)
+from app.todo.schemas import TodoOut
+from tests.conftest import test_async_engine
+
+
+def make_event(description: str = "") -> TodoEvent:
+    todo = TodoOut(title="Event Title", description=description)
+    return TodoEvent(type=TodoEventTypeEnum.CREATED, todo_id=todo.id, todo=todo)
+
+
+class TestTodoEventHub:
+    async def test_dispatch_to_user_subscribers(self):
+        hub = TodoEventHub(queue_size=10)
+        user_id, other_user_id = uuid4(), uuid4()
+        queue = hub.subscribe(user_id)
+        other_queue = hub.subscribe(other_user_id)
+
+        event = make_event()
+        hub.dispatch(user_id, [event])
+
+        assert queue.get_nowait() == event
+        assert other_queue.empty()
+
+        hub.unsubscribe(user_id, queue)
+        hub.unsubscribe(other_user_id, other_queue)
+        assert hub.subscriber_count == 0
+
+    async def test_slow_subscriber_drops_oldest(self):
+        hub = TodoEventHub(queue_size=2)
+        user_id = uuid4()
+        queue = hub.subscribe(user_id)
+
+        events = [make_event() for _ in range(3)]
+        hub.dispatch(user_id, events)
+
+        assert [queue.get_nowait(), queue.get_nowait()] == events[1:]
+
+
+class TestPostgresEventBroker:
+    def test_payloads_fit_notify_limit(self):
+        broker = PostgresEventBroker(hub=TodoEventHub(queue_size=1), engine=async_engine)
+        user_id = uuid4()
+        events = [make_event("é" * 1000) for _ in range(20)] + [make_event("y" * 9000)]
+
+        payloads = broker._payloads(user_id, events)
+
+        assert len(payloads) > 1
+        assert all(len(payload.encode()) < 8000 for payload in payloads)
+        decoded = [event for payload in payloads for event in json.loads(payload)["events"]]
+        assert [event["todo_id"] for event in decoded] == [
+            str(event.todo_id) for event in events
+        ]
+        assert "todo" not in decoded[-1]
+
+    async def test_notifies_on_commit_and_listens_again(self):
+        hub = TodoEventHub(queue_size=10)
+        broker = PostgresEventBroker(hub=hub, engine=test_async_engine, retry_seconds=0.05)
+        user_id = uuid4()
+        queue = hub.subscribe(user_id)
+        rolled_back, committed = make_event(), make_event()
+
+        await broker.start()
+        try:
+            await asyncio.wait_for(broker.listening.wait(), 5)
+            async with test_async_engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                        "WHERE query LIKE 'LISTEN %todo_events%'"
+                    )
+                )
+            while broker.listening.is_set():
+                await asyncio.sleep(0.01)
+            await asyncio.wait_for(broker.listening.wait(), 5)
+
+            async with AsyncSession(test_async_engine) as session:
+                await broker.stage(session, user_id, [rolled_back])
+                await session.rollback()
+                await broker.stage(session, user_id, [committed])
+                await session.commit()
+
+            assert await asyncio.wait_for(queue.get(), 5) == committed
+            assert queue.empty()
+        finally:
+            await broker.stop()
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.todo.tombstones import prune_tombstones
+from tests.conftest import test_async_engine
+
+
+async def test_prune_tombstones():
+    user_id, expired_id, retained_id = uuid4(), uuid4(), uuid4()
+    now = datetime.utcnow()
+    retention = timedelta(days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+    async with test_async_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO todo_tombstone (id, user_id, deleted_at) "
+                "VALUES (:expired_id, :user_id, :expired), "
+                "(:retained_id, :user_id, :retained)"
+            ),
+            {
+                "user_id": user_id,
+                "expired_id": expired_id,
+                "expired": now - retention - timedelta(minutes=1),
+                "retained_id": retained_id,
+                "retained": now - retention + timedelta(minutes=1),
+            },
+        )
+
+    assert await prune_tombstones(test_async_engine) >= 1
+
+    async with test_async_engine.connect() as conn:
+        remaining = await conn.scalars(
+            text("SELECT id FROM todo_tombstone WHERE user_id = :user_id"),
+            {"user_id": user_id},
+        )
+        assert list(remaining) == [retained_id]
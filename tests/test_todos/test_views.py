@@ -1,5 +1,17 @@
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.utils.instrumentation import InstrumentationMiddleware
+from app.core.utils.pagination import encode_sync_token
+from app.main import app
+from tests.conftest import test_async_engine
+from tests.utils.helpers import create_random_lower_string
 
 
 class TestTodos:
@@ -8,6 +20,246 @@ class TestTodos:
         response = await test_client.get("/todo/", headers=user_token_headers)
         assert response.status_code == 200
 
+    async def test_get_all_todos_paginated(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        for i in range(3):
+            await test_client.post(
+                "/todo/",
+                json={"title": f"Page Title {i}", "description": "Page Description"},
+                headers=user_token_headers,
+            )
+
+        response = await test_client.get(
+            "/todo/", params={"limit": 2}, headers=user_token_headers
+        )
+        assert response.status_code == 200
+
+        first_page = response.json()
+        assert len(first_page["items"]) == 2
+        assert first_page["next_cursor"] is not None
+
+        response = await test_client.get(
+            "/todo/",
+            params={"limit": 2, "after": first_page["next_cursor"]},
+            headers=user_token_headers,
+        )
+        assert response.status_code == 200
+
+        second_page = response.json()
+        first_ids = [todo["id"] for todo in first_page["items"]]
+        second_ids = [todo["id"] for todo in second_page["items"]]
+        assert second_ids
+        assert not set(first_ids) & set(second_ids)
+        assert first_ids == sorted(first_ids)
+
+    async def test_get_all_todos_invalid_cursor(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.get(
+            "/todo/", params={"after": "not-a-cursor"}, headers=user_token_headers
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid Cursor"
+
+    async def test_get_all_todos_filtered(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        marker = create_random_lower_string()
+        for i in range(3):
+            response = await test_client.post(
+                "/todo/",
+                json={
+                    "title": f"Filter Title {i}",
+                    "description": f"Filter {marker}",
+                    "iscompleted": i == 1,
+                },
+                headers=user_token_headers,
+            )
+            assert response.status_code == 200
+
+        response = await test_client.get(
+            "/todo/", params={"q": marker}, headers=user_token_headers
+        )
+        assert response.status_code == 200
+        titles = [todo["title"] for todo in response.json()["items"]]
+        assert titles == ["Filter Title 0", "Filter Title 1", "Filter Title 2"]
+
+        response = await test_client.get(
+            "/todo/",
+            params={"q": marker, "iscompleted": True},
+            headers=user_token_headers,
+        )
+        assert [todo["title"] for todo in response.json()["items"]] == [
+            "Filter Title 1"
+        ]
+
+        response = await test_client.get(
+            "/todo/",
+            params={"q": marker, "sort": "-updated", "limit": 2},
+            headers=user_token_headers,
+        )
+        first_page = response.json()
+        assert [todo["title"] for todo in first_page["items"]] == [
+            "Filter Title 2",
+            "Filter Title 1",
+        ]
+
+        response = await test_client.get(
+            "/todo/",
+            params={
+                "q": marker,
+                "sort": "-updated",
+                "limit": 2,
+                "after": first_page["next_cursor"],
+            },
+            headers=user_token_headers,
+        )
+        assert response.status_code == 200
+        assert [todo["title"] for todo in response.json()["items"]] == [
+            "Filter Title 0"
+        ]
+
+    async def test_get_all_todos_not_modified(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.get("/todo/", headers=user_token_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        response = await test_client.get(
+            "/todo/", headers={**user_token_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+        await test_client.post(
+            "/todo/",
+            json={"title": "Test Title", "description": "Test Description"},
+            headers=user_token_headers,
+        )
+        response = await test_client.get(
+            "/todo/", headers={**user_token_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    async def test_get_all_todos_write_from_another_worker(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.post(
+            "/todo/",
+            json={"title": "Worker Title", "description": "Worker Description"},
+            headers=user_token_headers,
+        )
+        todo_id = response.json()["id"]
+        # Newest first, so that the todo is on the page however many there are
+        params = {"limit": 1, "sort": "-created"}
+        response = await test_client.get(
+            "/todo/", params=params, headers=user_token_headers
+        )
+        etag = response.headers["etag"]
+
+        # Written without invalidating this process's cache, as by another worker
+        async with test_async_engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "UPDATE todo SET title = 'Other Worker Title', "
+                    "updated_at = now() AT TIME ZONE 'utc' WHERE id = :id"
+                ),
+                {"id": UUID(todo_id)},
+            )
+
+        response = await test_client.get(
+            "/todo/",
+            params=params,
+            headers={**user_token_headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        titles = {todo["id"]: todo["title"] for todo in response.json()["items"]}
+        assert titles[todo_id] == "Other Worker Title"
+
+    async def test_get_todo_not_modified(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.post(
+            "/todo/",
+            json={"title": "Test Title", "description": "Test Description"},
+            headers=user_token_headers,
+        )
+        todo_id = response.json()["id"]
+
+        response = await test_client.get(f"/todo/{todo_id}", headers=user_token_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        last_modified = response.headers["last-modified"]
+
+        response = await test_client.get(
+            f"/todo/{todo_id}", headers={**user_token_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        response = await test_client.get(
+            f"/todo/{todo_id}",
+            headers={**user_token_headers, "If-Modified-Since": last_modified},
+        )
+        assert response.status_code == 304
+
+    async def test_todo_stats(self, test_client: AsyncClient, user_token_headers):
+        response = await test_client.get("/todo/stats", headers=user_token_headers)
+        assert response.status_code == 200
+        before = response.json()
+
+        for i in range(2):
+            await test_client.post(
+                "/todo/",
+                json={
+                    "title": f"Stats Title {i}",
+                    "description": "Stats Description",
+                    "iscompleted": i == 0,
+                },
+                headers=user_token_headers,
+            )
+
+        response = await test_client.get(
+            "/todo/stats", params={"bucket": "month"}, headers=user_token_headers
+        )
+        assert response.status_code == 200
+
+        stats = response.json()
+        assert stats["total"] == before["total"] + 2
+        assert stats["completed"] == before["completed"] + 1
+        assert stats["pending"] == stats["total"] - stats["completed"]
+        assert stats["bucket"] == "month"
+        assert sum(bucket["created"] for bucket in stats["histogram"]) == stats["total"]
+        assert (
+            sum(bucket["completed"] for bucket in stats["histogram"])
+            == stats["completed"]
+        )
+
+    async def test_export_todos(self, test_client: AsyncClient, user_token_headers):
+        await test_client.post(
+            "/todo/",
+            json={"title": "Export Title", "description": "Export Description"},
+            headers=user_token_headers,
+        )
+
+        response = await test_client.get("/todo/export", headers=user_token_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert any(todo["title"] == "Export Title" for todo in lines)
+
+        response = await test_client.get(
+            "/todo/export", params={"format": "json"}, headers=user_token_headers
+        )
+        assert response.status_code == 200
+        assert [todo["id"] for todo in response.json()] == [
+            todo["id"] for todo in lines
+        ]
+
     async def test_create_todo(self, test_client: AsyncClient, user_token_headers):
         response = await test_client.post(
             "/todo/",
@@ -44,6 +296,71 @@ class TestTodos:
         assert data["title"] == "Updated Title"
         assert data["description"] == "Updated Description"
 
+    async def test_update_todo_server_timing(
+        self, test_client: AsyncClient, user_token_headers, monkeypatch
+    ):
+        response = await test_client.post(
+            "/todo/",
+            json={"title": "Timing Title", "description": "Timing Description"},
+            headers=user_token_headers,
+        )
+        todo_id = response.json()["id"]
+        # Off by default
+        assert "server-timing" not in response.headers
+
+        layer = app.middleware_stack
+        while not isinstance(layer, InstrumentationMiddleware):
+            layer = layer.app  # type: ignore
+        monkeypatch.setattr(layer, "server_timing", True)
+
+        response = await test_client.patch(
+            f"/todo/{todo_id}", json={"iscompleted": True}, headers=user_token_headers
+        )
+        assert response.status_code == 200
+
+        timings = {
+            entry.split(";")[0].strip(): entry
+            for entry in response.headers["server-timing"].split(",")
+        }
+        assert {"db", "pool", "auth", "serialise", "app"} <= set(timings)
+        assert 'queries"' in timings["db"]
+        assert 'desc="0 queries"' not in timings["db"]
+
+    async def test_get_todo_after_update(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.post(
+            "/todo/",
+            json={"title": "Test Title", "description": "Test Description"},
+            headers=user_token_headers,
+        )
+        todo_id = response.json()["id"]
+
+        # Warm the read cache, then make sure the write invalidates it
+        response = await test_client.get(f"/todo/{todo_id}", headers=user_token_headers)
+        assert response.json()["title"] == "Test Title"
+
+        await test_client.patch(
+            f"/todo/{todo_id}",
+            json={"title": "Updated Title"},
+            headers=user_token_headers,
+        )
+
+        response = await test_client.get(f"/todo/{todo_id}", headers=user_token_headers)
+        assert response.json()["title"] == "Updated Title"
+
+    async def test_update_missing_todo(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.patch(
+            "/todo/01900000-0000-7000-8000-000000000000",
+            json={"title": "Updated Title"},
+            headers=user_token_headers,
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Todo not found"
+
     async def test_delete_todo(self, test_client: AsyncClient, user_token_headers):
         response = await test_client.post(
             "/todo/",
@@ -68,3 +385,140 @@ class TestTodos:
         data = response.json()
 
         assert data["detail"] == "Todo not found"
+
+    async def test_batch_todos(self, test_client: AsyncClient, user_token_headers):
+        response = await test_client.post(
+            "/todo/batch",
+            json=[
+                {"title": f"Batch Title {i}", "description": "Batch Description"}
+                for i in range(3)
+            ],
+            headers=user_token_headers,
+        )
+        assert response.status_code == 200
+
+        created = response.json()["items"]
+        assert [item["status"] for item in created] == ["created"] * 3
+        assert [item["todo"]["title"] for item in created] == [
+            f"Batch Title {i}" for i in range(3)
+        ]
+        todo_ids = [item["id"] for item in created]
+        missing_id = "01900000-0000-7000-8000-000000000000"
+
+        response = await test_client.patch(
+            "/todo/batch",
+            json=[
+                {"id": todo_ids[0], "title": "Batch Updated", "iscompleted": True},
+                {"id": todo_ids[1], "description": "Batch Updated Description"},
+                {"id": missing_id, "title": "Missing"},
+            ],
+            headers=user_token_headers,
+        )
+        assert response.status_code == 200
+
+        updated = response.json()["items"]
+        assert [item["status"] for item in updated] == [
+            "updated",
+            "updated",
+            "not_found",
+        ]
+        assert updated[0]["todo"]["title"] == "Batch Updated"
+        assert updated[0]["todo"]["iscompleted"] is True
+        assert updated[1]["todo"]["title"] == "Batch Title 1"
+        assert updated[1]["todo"]["description"] == "Batch Updated Description"
+
+        response = await test_client.request(
+            "DELETE",
+            "/todo/batch",
+            json=[*todo_ids, missing_id],
+            headers=user_token_headers,
+        )
+        assert response.status_code == 200
+
+        deleted = response.json()["items"]
+        assert [item["status"] for item in deleted] == ["deleted"] * 3 + ["not_found"]
+
+        response = await test_client.get(f"/todo/{todo_ids[0]}", headers=user_token_headers)
+        assert response.status_code == 404
+
+    async def test_batch_todos_malformed_body(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.post(
+            "/todo/batch",
+            content=b'[{"title": "Malformed"',
+            headers={**user_token_headers, "Content-Type": "application/json"},
+        )
+        assert response.status_code == 422
+
+    async def test_todo_changes(
+        self, test_client: AsyncClient, user_token_headers, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "TODO_SYNC_SETTLE_SECONDS", 0.0)
+        # Drain the changes made so far to get an up-to-date token
+        token = None
+        while True:
+            params = {"since": token} if token else {}
+            response = await test_client.get(
+                "/todo/changes", params=params, headers=user_token_headers
+            )
+            assert response.status_code == 200
+            data = response.json()
+            token = data["next_token"]
+            if not data["has_more"]:
+                break
+
+        response = await test_client.post(
+            "/todo/",
+            json={"title": "Sync Title", "description": "Sync Description"},
+            headers=user_token_headers,
+        )
+        created_id = response.json()["id"]
+        response = await test_client.post(
+            "/todo/",
+            json={"title": "Sync Deleted", "description": "Sync Description"},
+            headers=user_token_headers,
+        )
+        deleted_id = response.json()["id"]
+        await test_client.delete(f"/todo/{deleted_id}", headers=user_token_headers)
+
+        response = await test_client.get(
+            "/todo/changes", params={"since": token}, headers=user_token_headers
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert [todo["id"] for todo in data["changed"]] == [created_id]
+        assert [tombstone["id"] for tombstone in data["deleted"]] == [deleted_id]
+
+        response = await test_client.get(
+            "/todo/changes",
+            params={"since": data["next_token"]},
+            headers=user_token_headers,
+        )
+        data = response.json()
+        assert data["changed"] == []
+        assert data["deleted"] == []
+        assert data["has_more"] is False
+
+    async def test_todo_changes_invalid_token(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        response = await test_client.get(
+            "/todo/changes", params={"since": "invalid"}, headers=user_token_headers
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid Sync Token"
+
+    async def test_todo_changes_expired_token(
+        self, test_client: AsyncClient, user_token_headers
+    ):
+        synced_at = datetime.utcnow() - timedelta(
+            days=settings.TODO_TOMBSTONE_RETENTION_DAYS, seconds=1
+        )
+        token = encode_sync_token(None, None, synced_at)
+        response = await test_client.get(
+            "/todo/changes", params={"since": token}, headers=user_token_headers
+        )
+        assert response.status_code == 410
+        assert response.json()["detail"] == "Sync Token Expired"